@@ -2,20 +2,33 @@
 # -*- coding: utf-8 -*-
 
 import sys
-import time
+import threading
 sys.stdout.reconfigure(encoding='utf-8')
 
 # --- Local Imports ---
 from Software.Face_Recognition import FaceRecognizer 
+from Software.Camera_Stream import CameraStream
+from Software.Presence_Service import PresenceService
 from Software.Tts_Player import play_tts, wait_until_finished
 from Software.Speech_Listener import SpeechListener
 from Software.Language_Manager import LanguageManager
-from Software.Response_Generator import generate_response
-from Software.Tts_Player import play_tts, stop_tts, is_playing
-from Software.Face_Display import init_display, set_face_state, shutdown_display, update_display
+from Software.Response_Generator import generate_response, generate_response_stream
+from Software.AI_Handler import cancel_requests
+from Software.Tts_Player import play_tts, stop_tts, is_playing, prewarm_tts, add_finished_listener
+from Software.Phrases import phrase, fixed_phrases
+from Software.Face_Display import init_display, set_face_state, shutdown_display, update_display, FRAME_RATE
+from Software.Event_Bus import EventBus, Ticker
+from Software.Tracing import end_turn, log_summary
+
+# Overlap the stages of a turn: recognition starts at short pauses, and the
+# AI's answer is translated and spoken sentence by sentence as it streams in.
+PIPELINED = True
 
 def main():
     print("AssistAI is starting...")
+
+    # Synthesize the fixed phrases while the face model loads and the camera looks for a user.
+    prewarm_tts(list(fixed_phrases()))
     
     # --- Face Recognition Setup ---
     # 2. Create an instance of the recognizer
@@ -32,35 +45,47 @@ def main():
 
     # 4. Recognize the user
     # This will now run for up to 10 seconds and require 5 confident matches
-    user_name = face_recognizer.recognize_face()
+    # The camera stays open afterwards so the presence service can keep watching.
+    camera = CameraStream()
+    camera_ok = camera.start()
+    user_name = face_recognizer.recognize_face(camera=camera) if camera_ok else None
 
     if not user_name:
         user_name = "Unknown" # Assign a default name if no one is recognized
 
     # --- The rest of your main function ---
     if user_name == "Unknown":
-        play_tts("I don't recognize you, but I will assist you anyway.", "en")
+        play_tts(phrase('unknown_user', "en"), "en")
         wait_until_finished()
     else:
         # Capitalize the first letter for a nicer greeting
-        play_tts(f"Hello, {user_name.capitalize()}. I am ready.", "en")
+        play_tts(phrase('ready', "en", user_name), "en")
         wait_until_finished()
+    # Now that the name is known, prepare the phrases that mention it.
+    prewarm_tts(list(fixed_phrases(user_name, personal_only=True)))
     
     init_display()
     
 
     
     lang_manager = LanguageManager()
-    speech_listener = SpeechListener()
-    
-    # --- Program States ---
-    robot_state = 'IDLE'
 
+    # Background threads report to the main loop through this bus, so it
+    # sleeps until something happens instead of polling.
+    bus = EventBus()
+    speech_listener = SpeechListener(event_bus=bus, pipelined=PIPELINED)
+    add_finished_listener(lambda: bus.post('tts_finished'))
+    display_ticker = Ticker(FRAME_RATE)
+
+    # Keep recognizing in the background so a new person is addressed by their own name.
+    presence = PresenceService(face_recognizer, camera=camera, busy_check=is_playing)
+    if camera_ok:
+        presence.start()
+    
     # --- Initial Greeting ---
-    play_tts(f"হ্যালো {user_name}! আমি প্রস্তুত।", "bn")
-    while is_playing():
-        update_display()
-        time.sleep(0.05)
+    play_tts(phrase('ready', "bn", user_name), "bn")
+    robot_state = 'GREETING'
+    turn_id = 0  # Tells a late response from a cancelled turn apart from the current one
     
     # --- Keyword Definitions ---
     exit_phrases = {
@@ -74,56 +99,84 @@ def main():
 
     # --- Main Interaction Loop ---
     while True:
-        update_display()
-
-        if robot_state == 'IDLE':
-            set_face_state('idle')
-            speech_listener.start_listening("bn-BD" if lang_manager.current_lang == "bn" else "en-US")
-            robot_state = 'LISTENING'
-
-        elif robot_state == 'LISTENING':
-            user_input = speech_listener.get_transcribed_text()
-            
-            if user_input is not None:
-                robot_state = 'PROCESSING' if user_input else 'IDLE'
-        
-        elif robot_state == 'PROCESSING':
-            set_face_state('thinking')
-            
-            if lang_manager.check_language_change(user_input):
-                robot_state = 'IDLE'
-                continue
+        event = bus.wait(timeout=display_ticker.time_left())
+        if display_ticker.due():
+            update_display()
+        kind = event.type if event else None
+        if kind == 'tts_finished' and is_playing():
+            # Left over from speech that was stopped or replaced; the current one is still playing.
+            kind = None
+
+        if robot_state in ('GREETING', 'CONFIRMING') and kind == 'tts_finished':
+            robot_state = 'IDLE'
 
-            if any(phrase in user_input.lower() for phrase in exit_phrases[lang_manager.current_lang]):
-                bye_msg = "বিদায়! ভালো থাকবেন" if lang_manager.current_lang == "bn" else "Goodbye! Stay well"
-                play_tts(bye_msg, lang_manager.current_lang)
-                while is_playing(): update_display(); time.sleep(0.05)
-                break
+        elif robot_state == 'LISTENING' and kind == 'transcribed':
+            user_input = event.data['text']
+            robot_state = 'PROCESSING' if user_input else 'IDLE'
 
-            response = generate_response(user_input, user_name, lang_manager.current_lang)
-            play_tts(response, lang_manager.current_lang)
+        elif robot_state == 'THINKING' and kind == 'response' and event.data['turn'] == turn_id:
+            play_tts(event.data['text'], lang_manager.current_lang, stream=True)
             robot_state = 'SPEAKING'
 
-        elif robot_state == 'SPEAKING':
-            # Start the interrupt listener. It will run continuously in the background.
-            lang_code = "bn-BD" if lang_manager.current_lang == "bn" else "en-US"
-            stop_words = interrupt_words[lang_manager.current_lang]
-            speech_listener.start_interrupt_listener(lang_code, stop_words)
-
-            # Loop as long as the robot is talking
-            while is_playing():
-                update_display()
-                if speech_listener.interrupt_event.is_set():
-                    print("Interrupt command received. Stopping speech.")
-                    stop_tts()
-                    break
-                time.sleep(0.05)
-            
+        elif (robot_state == 'SPEAKING' and kind in ('interrupt', 'tts_finished')) or \
+                (robot_state == 'THINKING' and kind == 'interrupt'):
+            if kind == 'interrupt':
+                print("Interrupt command received. Stopping speech.")
+                cancel_requests()
+                stop_tts()
             # CRUCIAL: Stop the interrupt listener thread to free up the microphone.
             speech_listener.stop_interrupt_listener()
             robot_state = 'IDLE'
 
-        time.sleep(0.01)
+        elif robot_state == 'EXITING' and kind == 'tts_finished':
+            speech_listener.close()
+            presence.stop()
+            camera.stop()
+            break
+
+        if robot_state == 'PROCESSING':
+            set_face_state('thinking')
+            
+            if lang_manager.check_language_change(user_input):
+                # Listen again once the confirmation has been spoken.
+                robot_state = 'CONFIRMING'
+            elif any(exit_phrase in user_input.lower() for exit_phrase in exit_phrases[lang_manager.current_lang]):
+                bye_msg = phrase('goodbye', lang_manager.current_lang)
+                play_tts(bye_msg, lang_manager.current_lang)
+                robot_state = 'EXITING'
+            else:
+                user_name = presence.get_current_user(default=user_name)
+                # Start the interrupt listener. It runs in the background until the speech ends,
+                # so the user can also stop the robot while it is still thinking.
+                lang_code = "bn-BD" if lang_manager.current_lang == "bn" else "en-US"
+                stop_words = interrupt_words[lang_manager.current_lang]
+                speech_listener.start_interrupt_listener(lang_code, stop_words)
+
+                turn_id += 1
+                if PIPELINED:
+                    response = generate_response_stream(user_input, user_name, lang_manager.current_lang)
+                    play_tts(response, lang_manager.current_lang, stream=True)
+                    robot_state = 'SPEAKING'
+                else:
+                    # Generate off the main thread so the display and interrupts stay live.
+                    threading.Thread(
+                        target=lambda turn, text, name, lang: bus.post(
+                            'response', turn=turn, text=generate_response(text, name, lang)),
+                        args=(turn_id, user_input, user_name, lang_manager.current_lang),
+                        daemon=True,
+                    ).start()
+                    robot_state = 'THINKING'
+
+        if robot_state == 'IDLE':
+            end_turn()
+            set_face_state('idle')
+            for presence_event in iter(presence.get_event, None):
+                if presence_event[0] in ('arrived', 'changed') and presence_event[-1] != user_name:
+                    user_name = presence_event[-1]
+                    prewarm_tts(list(fixed_phrases(user_name, personal_only=True)))
+            commands = exit_phrases[lang_manager.current_lang] + lang_manager.lang_commands[lang_manager.current_lang]
+            speech_listener.start_listening("bn-BD" if lang_manager.current_lang == "bn" else "en-US", commands)
+            robot_state = 'LISTENING'
 
 if __name__ == "__main__":
     try:
@@ -131,5 +184,6 @@ if __name__ == "__main__":
     except (KeyboardInterrupt, SystemExit):
         print("\nProgram interrupted by user. Shutting down.")
     finally:
+        log_summary()
         shutdown_display()
         print("AssistAI has shut down.")
@@ -0,0 +1,227 @@
+"""
+Client for the Google Gemini REST API.
+
+One HTTP session is reused for every request, so the TLS connection to the
+API stays open between turns. Answers can be streamed as they are
+generated, every request has connect, read and overall time limits, and
+requests in flight can be cancelled from another thread, e.g. when the
+user interrupts the robot.
+
+The API key is read from GEMINI_API_KEY, from the environment or the .env
+file in the project root. Set GEMINI_BASE_URL to point the client at a
+local mock server (python -m Software.mock_gemini) for offline testing.
+"""
+import json
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_MODEL = "gemini-1.5-flash"
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com"
+SYSTEM_PROMPT = ("You are Assist AI, a friendly robot assistant. Answer in plain spoken English "
+                 "in a few short sentences, without Markdown, lists or emojis.")
+FALLBACK_RESPONSE = "Sorry, I can't reach my brain right now. Please try again in a moment."
+
+class RequestCancelled(Exception):
+    """Raised when a request is cancelled while it is in flight."""
+
+class RequestFailed(Exception):
+    """Raised by gemini_api() when no answer could be obtained; the message says why."""
+
+def _load_env_file(path='.env'):
+    """Adds KEY=value lines from a .env file to the environment, without overriding set variables."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#') or '=' not in line:
+                    continue
+                key, value = line.split('=', 1)
+                os.environ.setdefault(key.strip(), value.strip().strip('"').strip("'"))
+    except OSError:
+        pass
+
+class GeminiClient:
+    """
+    A Gemini client with a pooled keep-alive session, streaming, timeouts
+    and cancellation.
+    """
+    def __init__(self, api_key=None, model=DEFAULT_MODEL, base_url=None, connect_timeout=5.0,
+                 read_timeout=20.0, total_timeout=45.0, system_prompt=SYSTEM_PROMPT, max_output_tokens=300):
+        """
+        Args:
+            api_key (str): API key; defaults to GEMINI_API_KEY.
+            model (str): Model name.
+            base_url (str): API root; defaults to GEMINI_BASE_URL or Google's endpoint.
+            connect_timeout (float): Seconds to establish the connection.
+            read_timeout (float): Seconds to wait for the next bytes of the answer.
+            total_timeout (float): Seconds a whole request may take.
+            system_prompt (str): Instructions sent with every request.
+            max_output_tokens (int): Upper bound on the answer length.
+        """
+        self.api_key = api_key or os.environ.get("GEMINI_API_KEY", "")
+        self.model = model
+        self.base_url = (base_url or os.environ.get("GEMINI_BASE_URL") or DEFAULT_BASE_URL).rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.total_timeout = total_timeout
+        self.system_prompt = system_prompt
+        self.max_output_tokens = max_output_tokens
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.lock = threading.Lock()
+        self.active = set()       # Responses currently being read
+        self.generation = 0       # Bumped by cancel(); requests started earlier are abandoned
+
+    def _payload(self, prompt, history):
+        contents = []
+        instructions = [self.system_prompt] if self.system_prompt else []
+        for entry in history or []:
+            role, _, text = entry.partition(": ")
+            if role == "Summary":
+                # A summary of older turns is context, not something either side said.
+                instructions.append(f"Summary of the earlier conversation: {text}")
+                continue
+            contents.append({'role': 'model' if role == "AI" else 'user', 'parts': [{'text': text}]})
+        contents.append({'role': 'user', 'parts': [{'text': prompt}]})
+        payload = {'contents': contents, 'generationConfig': {'maxOutputTokens': self.max_output_tokens}}
+        if instructions:
+            payload['systemInstruction'] = {'parts': [{'text': "\n\n".join(instructions)}]}
+        return payload
+
+    def _post(self, method, payload, params, cancellable):
+        if not self.api_key:
+            raise RuntimeError("GEMINI_API_KEY is not set")
+        url = f"{self.base_url}/v1beta/models/{self.model}:{method}"
+        if not cancellable:
+            response = self.session.post(url, params=params, headers={'x-goog-api-key': self.api_key},
+                                         json=payload, timeout=self.timeout, stream=True)
+            return response, None
+        with self.lock:
+            generation = self.generation
+        # The key goes in a header: a URL ends up in exception messages and logs.
+        response = self.session.post(url, params=params, headers={'x-goog-api-key': self.api_key},
+                                     json=payload, timeout=self.timeout, stream=True)
+        with self.lock:
+            if generation != self.generation:
+                response.close()
+                raise RequestCancelled()
+            self.active.add(response)
+        return response, generation
+
+    def _release(self, response, generation):
+        with self.lock:
+            self.active.discard(response)
+            cancelled = generation is not None and generation != self.generation
+        response.close()
+        return cancelled
+
+    @staticmethod
+    def _text(data):
+        parts = data.get('candidates', [{}])[0].get('content', {}).get('parts', [])
+        return "".join(part.get('text', '') for part in parts)
+
+    def generate(self, prompt, history=None, cancellable=True):
+        """Returns the whole answer. Raises RequestCancelled, requests exceptions or RuntimeError."""
+        return "".join(self.stream(prompt, history, cancellable))
+
+    def stream(self, prompt, history=None, cancellable=True):
+        """
+        Yields the answer in pieces as the model produces them. Closing the
+        generator early closes the connection. With cancellable=False,
+        cancel() leaves the request alone, e.g. for background work that
+        does not belong to the turn being interrupted.
+        """
+        deadline = time.monotonic() + self.total_timeout
+        response, generation = self._post('streamGenerateContent', self._payload(prompt, history),
+                                          {'alt': 'sse'}, cancellable)
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                if time.monotonic() > deadline:
+                    raise requests.Timeout(f"answer took longer than {self.total_timeout:.0f}s")
+                if not line or not line.startswith('data:'):
+                    continue
+                text = self._text(json.loads(line[len('data:'):]))
+                if text:
+                    yield text
+        except (requests.RequestException, ValueError, AttributeError):
+            # A response closed by cancel() surfaces as a read error.
+            with self.lock:
+                if generation is not None and generation != self.generation:
+                    raise RequestCancelled()
+            raise
+        finally:
+            cancelled = self._release(response, generation)
+        # The stream may also just end early when cancel() closed it.
+        if cancelled:
+            raise RequestCancelled()
+
+    def cancel(self):
+        """Abandons every cancellable request in flight; their callers get RequestCancelled."""
+        with self.lock:
+            self.generation += 1
+            active, self.active = list(self.active), set()
+        for response in active:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def close(self):
+        self.cancel()
+        self.session.close()
+
+_load_env_file()
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Returns the shared client, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GeminiClient()
+        return _client
+
+def cancel_requests():
+    """Cancels the AI requests in flight for the current turn, e.g. when the user interrupts."""
+    if _client is not None:
+        _client.cancel()
+
+def gemini_api(prompt, history=None, stream=False, cancellable=True):
+    """
+    Asks Gemini for an answer to `prompt`, given earlier "User: ..." and
+    "AI: ..." history lines.
+
+    Returns:
+        str: The answer. With stream=True, an iterator of answer pieces
+        instead, which raises the same exceptions while it is consumed.
+
+    Raises:
+        RequestFailed: The request failed; speak FALLBACK_RESPONSE instead,
+            but do not keep it as the model's answer.
+        RequestCancelled: cancel_requests() was called while it ran. Pass
+            cancellable=False for requests an interrupt should not stop.
+    """
+    if stream:
+        return _stream_answer(prompt, history, cancellable)
+    try:
+        return get_client().generate(prompt, history, cancellable)
+    except RequestCancelled:
+        raise
+    except Exception as e:
+        raise RequestFailed(str(e)) from e
+
+def _stream_answer(prompt, history, cancellable):
+    try:
+        yield from get_client().stream(prompt, history, cancellable)
+    except RequestCancelled:
+        raise
+    except Exception as e:
+        raise RequestFailed(str(e)) from e
@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+import speech_recognition as sr
+from .Voice_Activity import VoiceActivityDetector, PhraseSegmenter
+
+def chunk_energy(data):
+    """RMS energy of a chunk of 16-bit mono samples."""
+    samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+    return float(np.sqrt(np.mean(samples * samples))) if len(samples) else 0.0
+
+class AudioStream:
+    """
+    Keeps the microphone open for the whole session. A background thread
+    reads fixed-size chunks into a ring buffer, and every listener reads
+    from that buffer through its own cursor, so the device is opened once
+    and several listeners can share it. The energy threshold that separates
+    speech from silence is calibrated once at start-up and then keeps
+    following the background noise on the chunks that are not speech, so
+    no listener has to pause to recalibrate.
+    """
+    def __init__(self, device_index=None, sample_rate=16000, chunk_size=480, buffer_seconds=10.0,
+                 calibration_seconds=1.0, energy_ratio=1.5, damping=0.15, min_energy=50.0, vad=None):
+        """
+        Args:
+            device_index (int): Microphone index, or None for the default device.
+            sample_rate (int): Samples per second.
+            chunk_size (int): Samples per chunk (480 at 16 kHz is 30 ms).
+            buffer_seconds (float): How much recent audio the ring buffer holds.
+            calibration_seconds (float): Audio used for the initial noise estimate.
+            energy_ratio (float): Speech threshold as a multiple of the noise energy.
+            damping (float): Fraction of the threshold kept per second of noise;
+                smaller values follow changes in the noise faster.
+            min_energy (float): Lower bound for the threshold in a silent room.
+            vad (VoiceActivityDetector): Decides which phrases listen() returns.
+        """
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.sample_width = 2
+        self.chunk_seconds = chunk_size / sample_rate
+        self.chunks = deque(maxlen=max(1, int(buffer_seconds / self.chunk_seconds)))
+        self.condition = threading.Condition()
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.opened = threading.Event()
+        self.chunk_count = 0      # Chunks read from the device
+
+        self.calibration_chunks = max(1, int(calibration_seconds / self.chunk_seconds))
+        self.energy_ratio = energy_ratio
+        self.damping = damping ** self.chunk_seconds
+        self.min_energy = min_energy
+        self.energy_threshold = None
+        self._calibration = []
+        self.vad = vad or VoiceActivityDetector()
+
+    def start(self):
+        """Opens the microphone and starts the capture thread. Returns False if it cannot be opened."""
+        if self.is_running():
+            return True
+        self.stop_event.clear()
+        self.opened = threading.Event()
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+        self.opened.wait()
+        return self.is_running() and not self.stop_event.is_set()
+
+    def _capture_loop(self):
+        try:
+            microphone = sr.Microphone(device_index=self.device_index, sample_rate=self.sample_rate,
+                                       chunk_size=self.chunk_size)
+            with microphone as source:
+                self.opened.set()
+                while not self.stop_event.is_set():
+                    self.feed(source.stream.read(self.chunk_size))
+        except Exception as e:
+            print(f"[Audio] Microphone error: {e}")
+        finally:
+            self.stop_event.set()
+            self.opened.set()
+            with self.condition:
+                self.condition.notify_all()
+
+    def feed(self, data):
+        """
+        Adds a chunk to the buffer and returns its energy. Called by the
+        capture thread; replay tools call it directly with recorded audio.
+        """
+        energy = chunk_energy(data)
+        with self.condition:
+            self._calibrate(energy)
+            self.chunk_count += 1
+            self.chunks.append((self.chunk_count, data, energy))
+            self.condition.notify_all()
+        return energy
+
+    def _calibrate(self, energy):
+        if self.energy_threshold is None:
+            self._calibration.append(energy)
+            if len(self._calibration) >= self.calibration_chunks:
+                noise = sum(self._calibration) / len(self._calibration)
+                self.energy_threshold = max(self.min_energy, noise * self.energy_ratio)
+                self._calibration = []
+        elif energy <= self.energy_threshold:
+            # Only quiet chunks move the threshold, so speech does not raise it.
+            target = max(self.min_energy, energy * self.energy_ratio)
+            self.energy_threshold = self.energy_threshold * self.damping + target * (1 - self.damping)
+
+    def reader(self):
+        """Returns a cursor that yields the chunks captured from now on."""
+        return AudioReader(self)
+
+    def listen(self, timeout=None, phrase_time_limit=None, pause_threshold=0.8, pre_roll=0.3, stop_event=None,
+               partial_pause=None, on_partial=None):
+        """
+        Waits for a phrase and returns it, in the same way as
+        sr.Recognizer.listen but reading from the shared buffer. Segments
+        the voice activity detector rejects are skipped.
+
+        Args:
+            timeout (float): Seconds to wait for speech to start; None waits indefinitely.
+            phrase_time_limit (float): Maximum length of the phrase in seconds.
+            pause_threshold (float): Seconds of silence that end the phrase.
+            pre_roll (float): Seconds of audio before the speech started to include.
+            stop_event (threading.Event): Returns None early once this is set.
+            partial_pause (float): Seconds of silence after which the phrase so
+                far is handed to `on_partial`, before the phrase has ended.
+            on_partial (callable): Called with the phrase so far (sr.AudioData)
+                at each such pause, and with None when speech resumes or the
+                phrase is dropped. If the last call before listen() returns
+                was not None, that audio holds all the speech of the result.
+
+        Returns:
+            sr.AudioData: The phrase, or None if `stop_event` was set or the stream ended.
+
+        Raises:
+            sr.WaitTimeoutError: If no speech started within `timeout`.
+        """
+        reader = self.reader()
+        segmenter = PhraseSegmenter(self.vad, self.chunk_seconds, pause_threshold, phrase_time_limit, pre_roll)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        partial_chunks = None if on_partial is None else max(1, int((partial_pause or 0) / self.chunk_seconds))
+        partial_sent = False
+
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                return None
+            chunk = reader.read(timeout=0.1)
+            if chunk is not None:
+                phrase = segmenter.feed(*chunk, self.energy_threshold)
+                if phrase is not None:
+                    return sr.AudioData(phrase, self.sample_rate, self.sample_width)
+                if partial_chunks is not None:
+                    if partial_sent and segmenter.silent == 0:
+                        # Speech resumed, or the phrase was dropped: the partial phrase is stale.
+                        on_partial(None)
+                        partial_sent = False
+                    elif segmenter.in_phrase and segmenter.silent == partial_chunks:
+                        on_partial(sr.AudioData(b"".join(segmenter.frames), self.sample_rate, self.sample_width))
+                        partial_sent = True
+            elif self.stop_event.is_set():
+                return None
+            if not segmenter.in_phrase and deadline is not None and time.monotonic() > deadline:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def stop(self):
+        """Stops the capture thread and closes the microphone."""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+class AudioReader:
+    """One consumer's position in an AudioStream's ring buffer."""
+    def __init__(self, stream):
+        self.stream = stream
+        with stream.condition:
+            self.position = stream.chunk_count
+        self.dropped_count = 0    # Chunks that were overwritten before this reader got to them
+
+    def read(self, timeout=1.0):
+        """
+        Returns the next (chunk bytes, energy) pair, waiting up to `timeout`
+        seconds for it, or None if none arrived in time.
+        """
+        stream = self.stream
+        deadline = time.monotonic() + timeout
+        with stream.condition:
+            while not stream.chunks or stream.chunks[-1][0] <= self.position:
+                remaining = deadline - time.monotonic()
+                if stream.stop_event.is_set() or remaining <= 0:
+                    return None
+                stream.condition.wait(remaining)
+            oldest = stream.chunks[0][0]
+            if self.position < oldest - 1:
+                # Fell further behind than the buffer holds; skip to the oldest chunk left.
+                self.dropped_count += oldest - 1 - self.position
+                self.position = oldest - 1
+            seq, data, energy = stream.chunks[self.position - oldest + 1]
+            self.position = seq
+            return data, energy
@@ -0,0 +1,140 @@
+import cv2
+import threading
+import time
+from collections import deque
+
+class CameraStream:
+    """
+    Reads frames from a camera in a background thread and keeps only the
+    newest few in a small ring buffer, so consumers never process stale
+    frames that piled up while they were busy.
+    """
+    def __init__(self, source=0, buffer_size=2):
+        """
+        Args:
+            source (int or str): Camera index, or a video file path for offline runs.
+            buffer_size (int): How many of the newest frames to keep; older ones are dropped.
+        """
+        self.source = source
+        self.frames = deque(maxlen=max(1, buffer_size))
+        self.condition = threading.Condition()
+        self.cap = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.frame_count = 0      # Frames read from the device
+        self.dropped_count = 0    # Frames overwritten before anyone consumed them
+        self._last_consumed = 0
+
+    def start(self):
+        """Opens the camera and starts the capture thread. Returns False if it cannot be opened."""
+        if self.is_running():
+            return True
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            print(f"[ERROR] Cannot open camera at index {self.source}")
+            self.cap = None
+            return False
+        # Ask the driver not to queue frames of its own; not every backend honours it.
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+        return True
+
+    def _capture_loop(self):
+        while not self.stop_event.is_set():
+            ret, frame = self.cap.read()
+            if not ret:
+                print("[Camera] No more frames from the source.")
+                break
+            with self.condition:
+                self.frame_count += 1
+                if len(self.frames) == self.frames.maxlen and self.frames[0][0] > self._last_consumed:
+                    self.dropped_count += 1
+                self.frames.append((self.frame_count, time.monotonic(), frame))
+                self.condition.notify_all()
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+
+    def get_latest_frame(self, timeout=1.0):
+        """
+        Returns the newest frame that has not been handed out yet, waiting up
+        to `timeout` seconds for one to arrive.
+
+        Returns:
+            numpy.ndarray: The BGR frame, or None if no new frame arrived in time
+            or the stream has ended.
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while not self.frames or self.frames[-1][0] <= self._last_consumed:
+                remaining = deadline - time.monotonic()
+                if self.stop_event.is_set() or remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+            seq, _, frame = self.frames[-1]
+            self._last_consumed = seq
+            return frame
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def stop(self):
+        """Stops the capture thread and releases the camera."""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+
+class VideoFileStream:
+    """
+    A frame source backed by a recorded video file, with the same interface
+    as CameraStream. Frames are decoded on demand and in order, without
+    dropping any, so benchmark runs are repeatable on machines with no camera.
+    """
+    def __init__(self, path):
+        self.source = path
+        self.cap = None
+        self.fps = 0.0
+        self.frame_count = 0
+        self.dropped_count = 0
+        self.ended = False
+
+    def start(self):
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            print(f"[ERROR] Cannot open video file '{self.source}'")
+            self.cap = None
+            return False
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = 0
+        self.ended = False
+        return True
+
+    def get_latest_frame(self, timeout=1.0):
+        """Returns the next frame of the recording, or None once it has ended."""
+        if self.cap is None or self.ended:
+            return None
+        ret, frame = self.cap.read()
+        if not ret:
+            self.ended = True
+            return None
+        self.frame_count += 1
+        return frame
+
+    def position(self):
+        """Seconds into the recording of the last frame returned."""
+        return self.frame_count / self.fps if self.fps else 0.0
+
+    def is_running(self):
+        return self.cap is not None and not self.ended
+
+    def stop(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
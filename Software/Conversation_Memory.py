@@ -0,0 +1,107 @@
+import threading
+from collections import deque
+
+def estimate_tokens(text):
+    """Rough token count: about four characters per token for English text."""
+    return len(text) // 4 + 1
+
+class ConversationMemory:
+    """
+    Conversation history per recognized user, kept within a token budget.
+    The most recent messages are kept word for word; once the history grows
+    past `token_budget`, older messages are folded into a running summary by
+    `summarize` on a background thread, so the prompt sent with every
+    request stays about the same size however long the conversation gets.
+    Until the new summary is ready, the messages being summarized are
+    still included as they are.
+    """
+    def __init__(self, summarize, token_budget=600, keep_recent=4, summary_tokens=150):
+        """
+        Args:
+            summarize (callable): `summarize(previous_summary, messages, max_tokens)`
+                returns a new summary string; `messages` are "User: ..." and
+                "AI: ..." lines. It may raise or return "" on failure.
+            token_budget (int): Tokens of verbatim history allowed before compacting.
+            keep_recent (int): Messages always kept verbatim (2 per exchange).
+            summary_tokens (int): Size the summary is asked to stay within.
+        """
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.summary_tokens = summary_tokens
+        self.lock = threading.Lock()
+        self.users = {}
+
+    def _state(self, user):
+        if user not in self.users:
+            self.users[user] = {'summary': "", 'messages': deque(), 'compacting': [], 'busy': False}
+        return self.users[user]
+
+    def add_exchange(self, user, user_text, ai_text):
+        """Records one question and answer for `user` and compacts the history if it is over budget."""
+        with self.lock:
+            state = self._state(user)
+            state['messages'].append((f"User: {user_text}", estimate_tokens(user_text)))
+            state['messages'].append((f"AI: {ai_text}", estimate_tokens(ai_text)))
+            old = self._take_old_messages(state)
+        if old:
+            threading.Thread(target=self._compact, args=(user, old), daemon=True).start()
+
+    def _take_old_messages(self, state):
+        if state['busy'] or sum(tokens for _, tokens in state['messages']) <= self.token_budget:
+            return None
+        old = []
+        while len(state['messages']) > self.keep_recent:
+            old.append(state['messages'].popleft()[0])
+        if not old:
+            return None
+        state['compacting'] = old
+        state['busy'] = True
+        return old
+
+    def _compact(self, user, old):
+        with self.lock:
+            previous = self._state(user)['summary']
+        try:
+            summary = self.summarize(previous, old, self.summary_tokens)
+        except Exception as e:
+            print(f"[Memory] Summarizing failed: {e}")
+            summary = ""
+        if not summary:
+            # Keep something rather than nothing: the latest lines, cut to the summary size.
+            summary = " ".join([previous] + old)[-self.summary_tokens * 4:]
+        with self.lock:
+            state = self._state(user)
+            state['summary'] = summary.strip()
+            state['compacting'] = []
+            state['busy'] = False
+            # Messages added meanwhile may already need the next compaction.
+            more = self._take_old_messages(state)
+        if more:
+            self._compact(user, more)
+
+    def history(self, user):
+        """The lines to send with the next request: the summary (if any) and the recent messages."""
+        with self.lock:
+            state = self._state(user)
+            lines = [f"Summary: {state['summary']}"] if state['summary'] else []
+            lines += state['compacting']
+            lines += [text for text, _ in state['messages']]
+            return lines
+
+    def tokens(self, user):
+        """Estimated tokens of what history() currently returns."""
+        return sum(estimate_tokens(line) for line in self.history(user))
+
+    def last_user_input(self, user):
+        """The user's previous question, or None."""
+        with self.lock:
+            state = self._state(user)
+            for text, _ in reversed(state['messages']):
+                if text.startswith("User: "):
+                    return text[len("User: "):]
+        return None
+
+    def forget(self, user):
+        with self.lock:
+            self.users.pop(user, None)
@@ -0,0 +1,53 @@
+import time
+from collections import namedtuple
+from queue import Queue, Empty
+
+# An event has a type such as 'transcribed' and a dict of data, e.g. {'text': ...}.
+Event = namedtuple('Event', ['type', 'data'])
+
+class EventBus:
+    """
+    A thread-safe queue of events. Background threads (speech recognition,
+    TTS playback, presence detection) post events, and the main loop sleeps
+    in wait() until one arrives, so state changes are handled immediately
+    without polling.
+    """
+    def __init__(self):
+        self.queue = Queue()
+
+    def post(self, event_type, **data):
+        """Posts an event. Safe to call from any thread."""
+        self.queue.put(Event(event_type, data))
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the next event arrives or `timeout` seconds pass.
+
+        Returns:
+            Event: The next event, or None on timeout.
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except Empty:
+            return None
+
+class Ticker:
+    """Tracks a fixed-rate deadline, e.g. for display frames, within an event loop."""
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_tick = time.monotonic()
+
+    def time_left(self):
+        """Seconds until the next tick is due; 0 if it is already due."""
+        return max(0.0, self.next_tick - time.monotonic())
+
+    def due(self):
+        """Returns True, and schedules the following tick, if a tick is due."""
+        now = time.monotonic()
+        if now < self.next_tick:
+            return False
+        self.next_tick += self.interval
+        if self.next_tick <= now:
+            # Skip missed ticks instead of bursting to catch up.
+            self.next_tick = now + self.interval
+        return True
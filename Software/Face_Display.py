@@ -1,7 +1,10 @@
 import pygame
+import json
+import math
 import os
 import time
 import threading
+from collections import namedtuple
 from itertools import cycle
 
 # --- Configuration ---
@@ -10,14 +13,23 @@ SCREEN_HEIGHT = 480
 IMAGE_PATH = "images"  # Folder where your animation frames are
 BACKGROUND_COLOR = (24, 28, 46) # Dark blue background
 FRAME_RATE = 10  # Frames per second for the animation
+# Prepared frames are packed into this image so later starts skip the compositing. None disables it.
+ATLAS_PATH = os.path.join("display_cache", "face_atlas.png")
+STATES = ['idle', 'listening', 'talking', 'thinking']
+
+# A frame ready to show: an opaque surface in the display's pixel format and
+# the screen rectangle it is drawn at.
+Frame = namedtuple('Frame', ['surface', 'rect'])
 
 # --- Globals ---
 screen = None
-faces = {}  # Will store lists of images, e.g., {'idle': [img1, img2, ...]}
+faces = {}  # Will store lists of Frames, e.g., {'idle': [frame1, frame2, ...]}
 current_state = 'idle'
-current_frame = None # This will hold the surface of the frame to be drawn
+current_frame = None # This will hold the Frame to be drawn
 animation_thread = None
 stop_event = threading.Event()
+_presented = None # The Frame currently on screen
+_full_redraw = True # Repaint the whole screen on the next update, e.g. after the window was uncovered
 
 def _animation_logic_loop():
     """
@@ -29,13 +41,13 @@ def _animation_logic_loop():
     clock = pygame.time.Clock()
     face_iterators = {state: cycle(frames) for state, frames in faces.items()}
     
-    active_iterator = face_iterators.get(current_state, cycle([pygame.Surface((1,1))]))
+    active_iterator = face_iterators.get(current_state, face_iterators['idle'])
     last_state = current_state
 
     while not stop_event.is_set():
         # Check if the state has changed
         if current_state != last_state:
-            active_iterator = face_iterators.get(current_state, cycle([pygame.Surface((1,1))]))
+            active_iterator = face_iterators.get(current_state, face_iterators['idle'])
             last_state = current_state
             
         # Get the next frame and store it in the global variable
@@ -51,19 +63,16 @@ def update_display():
     """
     This function should be called from the main loop.
     It handles drawing the current frame and processing events.
+    The main loop calls it far more often than the animation advances, so
+    the screen is only touched when the frame has changed.
     """
+    global _full_redraw
     if not screen or current_frame is None:
         return
 
-    # Fill the background
-    screen.fill(BACKGROUND_COLOR)
-
-    # Calculate center position and draw the current face frame
-    rect = current_frame.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-    screen.blit(current_frame, rect)
-    
-    # Update the display
-    pygame.display.flip()
+    frame = current_frame
+    if frame is not _presented or _full_redraw:
+        _draw(frame)
     
     # Process pygame events to keep the window responsive
     for event in pygame.event.get():
@@ -71,39 +80,159 @@ def update_display():
             stop_event.set() # Signal thread to stop
             pygame.quit()
             exit()
+        if event.type in (pygame.VIDEOEXPOSE, getattr(pygame, 'WINDOWEXPOSED', pygame.VIDEOEXPOSE)):
+            _full_redraw = True
 
-def init_display():
-    """Initializes pygame, loads all animation frames, and starts the logic thread."""
-    global screen, faces, animation_thread, current_frame
-    
-    pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("AssistAI Face")
+def _draw(frame):
+    """Draws `frame` and pushes only the changed part of the screen to the display."""
+    global _presented, _full_redraw
+    if _full_redraw or _presented is None:
+        screen.fill(BACKGROUND_COLOR)
+        screen.blit(frame.surface, frame.rect)
+        pygame.display.flip()
+        _full_redraw = False
+    else:
+        dirty = [frame.rect]
+        # Frames already carry the background, so it is only repainted where
+        # the new frame does not cover the previous one.
+        if not frame.rect.contains(_presented.rect):
+            screen.fill(BACKGROUND_COLOR, _presented.rect)
+            dirty.append(_presented.rect)
+        screen.blit(frame.surface, frame.rect)
+        pygame.display.update(dirty)
+    _presented = frame
 
-    states = ['idle', 'listening', 'talking', 'thinking']
-    for state in states:
-        faces[state] = []
+def prepare_frame(image):
+    """
+    Composites an animation image over the background once, centred on the
+    screen, into an opaque surface in the display's pixel format. Drawing it
+    is then a plain copy instead of per-pixel alpha blending on every tick.
+    """
+    rect = image.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+    visible = rect.clip(pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
+    surface = pygame.Surface(visible.size).convert()
+    surface.fill(BACKGROUND_COLOR)
+    surface.blit(image, (rect.x - visible.x, rect.y - visible.y))
+    return Frame(surface, visible)
+
+def _find_frames():
+    """Returns the image files of each state, in animation order."""
+    sources = {}
+    for state in STATES:
+        sources[state] = []
         i = 0
         while True:
             filepath = os.path.join(IMAGE_PATH, f"{state}_{i}.png")
             if not os.path.exists(filepath):
                 break
+            sources[state].append(filepath)
+            i += 1
+    return sources
+
+def _atlas_key(sources):
+    """Describes everything the prepared frames depend on; a changed key invalidates the atlas."""
+    files = [[path, os.path.getmtime(path), os.path.getsize(path)]
+             for state in STATES for path in sources[state]]
+    return {'screen': [SCREEN_WIDTH, SCREEN_HEIGHT], 'background': list(BACKGROUND_COLOR), 'files': files}
+
+def _load_atlas(sources):
+    """Returns the prepared frames from the atlas on disk, or None if it is missing or out of date."""
+    if not ATLAS_PATH or not os.path.exists(ATLAS_PATH):
+        return None
+    index_path = os.path.splitext(ATLAS_PATH)[0] + '.json'
+    try:
+        with open(index_path, encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('key') != _atlas_key(sources):
+            return None
+        atlas = pygame.image.load(ATLAS_PATH).convert()
+        loaded = {}
+        for state, entries in index['frames'].items():
+            loaded[state] = [Frame(atlas.subsurface(pygame.Rect(area)).copy(), pygame.Rect(dest))
+                             for area, dest in entries]
+    except (OSError, ValueError, KeyError, TypeError, pygame.error) as e:
+        print(f"[Display] Ignoring unreadable frame atlas: {e}")
+        return None
+    if any(not loaded.get(state) for state in STATES):
+        return None
+    print(f"[Display] Loaded {sum(len(frames) for frames in loaded.values())} prepared frames from {ATLAS_PATH}")
+    return loaded
+
+def _save_atlas(prepared, sources):
+    """Packs the prepared frames into one image, row by row, with an index of where each one is."""
+    if not ATLAS_PATH:
+        return
+    frames = [(state, frame) for state in STATES for frame in prepared[state]]
+    columns = max(1, math.ceil(math.sqrt(len(frames))))
+    index = {'key': _atlas_key(sources), 'frames': {state: [] for state in STATES}}
+    areas = []
+    x = y = row_height = width = 0
+    for count, (state, frame) in enumerate(frames):
+        if count and count % columns == 0:
+            x, y, row_height = 0, y + row_height, 0
+        w, h = frame.surface.get_size()
+        areas.append((frame, (x, y)))
+        index['frames'][state].append([[x, y, w, h], list(frame.rect)])
+        x += w
+        width = max(width, x)
+        row_height = max(row_height, h)
+
+    atlas = pygame.Surface((width, y + row_height))
+    for frame, position in areas:
+        atlas.blit(frame.surface, position)
+    base_path = os.path.splitext(ATLAS_PATH)[0]
+    try:
+        directory = os.path.dirname(ATLAS_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # The temporary name keeps the extension, which tells pygame the format.
+        tmp_path = base_path + '.tmp' + os.path.splitext(ATLAS_PATH)[1]
+        pygame.image.save(atlas, tmp_path)
+        os.replace(tmp_path, ATLAS_PATH)
+        with open(base_path + '.json', 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        print(f"[Display] Saved the frame atlas to {ATLAS_PATH}")
+    except (OSError, pygame.error) as e:
+        print(f"[Display] Could not save the frame atlas: {e}")
+
+def _prepare_faces(sources):
+    """Loads and prepares every frame from the image files."""
+    prepared = {}
+    for state in STATES:
+        prepared[state] = []
+        for filepath in sources[state]:
             try:
                 img = pygame.image.load(filepath).convert_alpha()
-                faces[state].append(img)
+                prepared[state].append(prepare_frame(img))
                 print(f"[Display] Loaded {filepath} for state '{state}'")
             except pygame.error as e:
                 print(f"[Display ERROR] Could not load image {filepath}: {e}")
-            i += 1
         
-        if not faces[state]:
+        if not prepared[state]:
             print(f"[Display WARNING] No frames found for state '{state}'. Using placeholder.")
             placeholder = pygame.Surface((100, 100))
             placeholder.fill((255, 0, 255))
-            faces[state].append(placeholder)
+            prepared[state].append(prepare_frame(placeholder))
+    return prepared
+
+def init_display():
+    """Initializes pygame, loads all animation frames, and starts the logic thread."""
+    global screen, faces, animation_thread, current_frame, _presented, _full_redraw
+    
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("AssistAI Face")
+
+    sources = _find_frames()
+    faces = _load_atlas(sources)
+    if faces is None:
+        faces = _prepare_faces(sources)
+        _save_atlas(faces, sources)
 
     # Set the very first frame to avoid a blank screen on start
     current_frame = faces['idle'][0]
+    _presented = None
+    _full_redraw = True
 
     # Start the animation logic thread
     stop_event.clear()
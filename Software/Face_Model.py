@@ -0,0 +1,103 @@
+"""
+Compact binary storage for the trained face model.
+
+The model is a directory of plain NumPy files that are memory-mapped on
+load, so startup does not parse OpenCV's YAML model and the histograms
+are paged in from disk on demand instead of being copied into RAM:
+
+    histograms.npy  float32, (bins, samples), bin-major as LBPHMatcher uses it
+    totals.npy      float64, (samples,), sum of each histogram
+    labels.npy      int32, (samples,), label id of each histogram
+    meta.json       LBPH parameters and the {id: name} label map
+
+Convert an existing trainer/trained_model.yml + labels.pkl with:
+
+    python -m Software.Face_Model trainer/trained_model.yml trainer/labels.pkl trainer/model
+"""
+import cv2
+import json
+import os
+import pickle
+import sys
+import numpy as np
+from .Lbph_Matcher import LBPHMatcher
+
+FORMAT_VERSION = 1
+
+def save_model(model_dir, matcher, names):
+    """
+    Writes a matcher and its label names to `model_dir`. Files are written
+    under temporary names first so a crash never leaves a half-written model.
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    arrays = {
+        'histograms': np.ascontiguousarray(matcher.histograms_by_bin, dtype=np.float32),
+        'totals': np.asarray(matcher.stored_totals, dtype=np.float64),
+        'labels': np.asarray(matcher.labels, dtype=np.int32),
+    }
+    meta = {
+        'version': FORMAT_VERSION,
+        'radius': matcher.radius,
+        'neighbors': matcher.neighbors,
+        'grid_x': matcher.grid_x,
+        'grid_y': matcher.grid_y,
+        'names': {str(k): v for k, v in names.items()},
+    }
+    for name, array in arrays.items():
+        tmp_path = os.path.join(model_dir, f"{name}.tmp.npy")
+        np.save(tmp_path, array)
+        os.replace(tmp_path, os.path.join(model_dir, f"{name}.npy"))
+    tmp_path = os.path.join(model_dir, 'meta.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    # meta.json is written last: its presence marks a complete model.
+    os.replace(tmp_path, os.path.join(model_dir, 'meta.json'))
+
+def model_mtime(model_dir):
+    """Returns when the model in `model_dir` was completed, or None if there is none."""
+    meta_path = os.path.join(model_dir, 'meta.json')
+    return os.path.getmtime(meta_path) if os.path.exists(meta_path) else None
+
+def load_model(model_dir, mmap=True):
+    """
+    Loads a model saved by save_model().
+
+    Returns:
+        tuple: (LBPHMatcher, {id: name}), or (None, None) if the model is
+        missing or was written by an incompatible version.
+    """
+    meta_path = os.path.join(model_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None, None
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != FORMAT_VERSION:
+        return None, None
+
+    mode = 'r' if mmap else None
+    matcher = LBPHMatcher(
+        np.load(os.path.join(model_dir, 'histograms.npy'), mmap_mode=mode),
+        np.load(os.path.join(model_dir, 'labels.npy')),
+        radius=meta['radius'],
+        neighbors=meta['neighbors'],
+        grid_x=meta['grid_x'],
+        grid_y=meta['grid_y'],
+        stored_totals=np.load(os.path.join(model_dir, 'totals.npy')),
+    )
+    names = {int(k): v for k, v in meta['names'].items()}
+    return matcher, names
+
+def convert_model(model_path, labels_path, model_dir):
+    """Converts an OpenCV YAML model and its labels pickle to the binary format."""
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.read(model_path)
+    with open(labels_path, 'rb') as f:
+        names = pickle.load(f)
+    save_model(model_dir, LBPHMatcher.from_recognizer(recognizer), names)
+    print(f"[INFO] Converted '{model_path}' to binary model in '{model_dir}'.")
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: python -m Software.Face_Model MODEL.yml LABELS.pkl OUTPUT_DIR")
+        sys.exit(1)
+    convert_model(*sys.argv[1:])
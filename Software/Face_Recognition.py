@@ -1,73 +1,299 @@
 import cv2
+import multiprocessing
 import os
 import numpy as np
 import pickle
 import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from .Camera_Stream import CameraStream
+from .Lbph_Matcher import LBPHMatcher
+from .Face_Model import save_model, load_model, model_mtime
+
+# Bump when the layout of the ROI cache changes so stale caches are discarded.
+ROI_CACHE_VERSION = 1
+
+# Cascade owned by each training worker process, created once by _init_worker.
+_worker_cascade = None
+
+def _extract_rois(face_cascade, path):
+    """Decodes one image and returns the grayscale face crops found in it."""
+    image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        return []
+    detected_faces = face_cascade.detectMultiScale(image, scaleFactor=1.1, minNeighbors=5)
+    return [image[y:y+h, x:x+w].copy() for (x, y, w, h) in detected_faces]
+
+def _init_worker(cascade_path):
+    global _worker_cascade
+    # Each worker owns one core; OpenCV's own thread pool would only oversubscribe it.
+    cv2.setNumThreads(1)
+    _worker_cascade = cv2.CascadeClassifier(cascade_path)
+
+def _worker_context():
+    """
+    Start workers from a clean process instead of forking this one: the
+    robot already runs threads (TTS prewarming, the audio mixer) when it
+    trains, and a fork taken while another thread holds a lock can deadlock.
+    Such workers import the main script again, so the robot's modules open
+    the sound device and the Arduino port on first use, not at import.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+def _extract_rois_worker(path):
+    return _extract_rois(_worker_cascade, path)
+
+class FaceTracker:
+    """
+    Finds faces in a stream of grayscale frames cheaply. Full detection runs
+    on a downscaled copy of the frame every `full_detect_interval` frames;
+    in between, only a window around the last face found is searched.
+    """
+    def __init__(self, face_cascade, detect_scale=0.5, min_face_size=60,
+                 full_detect_interval=5, search_margin=0.5, scale_factor=1.2, min_neighbors=5):
+        """
+        Args:
+            face_cascade (cv2.CascadeClassifier): The loaded face detector.
+            detect_scale (float): Factor the frame is resized by for full detection.
+            min_face_size (int): Smallest face side, in full-frame pixels, worth detecting.
+            full_detect_interval (int): Frames between two full-frame detections.
+            search_margin (float): How far, relative to the face size, the tracking
+                window extends around the last face.
+            scale_factor (float): Cascade scaleFactor used for full detection.
+            min_neighbors (int): Cascade minNeighbors used for full detection.
+        """
+        self.face_cascade = face_cascade
+        self.detect_scale = detect_scale
+        self.min_face_size = min_face_size
+        self.full_detect_interval = max(1, full_detect_interval)
+        self.search_margin = search_margin
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.reset()
+
+    def reset(self):
+        """Forgets the tracked face so the next frame gets a full detection."""
+        self.last_box = None
+        self.frames_since_full = 0
+
+    def _detect_full(self, gray):
+        scale = self.detect_scale
+        small = gray
+        if scale < 1.0:
+            small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        min_side = max(20, int(self.min_face_size * scale))
+        faces = self.face_cascade.detectMultiScale(small, scaleFactor=self.scale_factor,
+                                                   minNeighbors=self.min_neighbors,
+                                                   minSize=(min_side, min_side))
+        return [tuple(int(round(v / scale)) for v in face) for face in faces]
+
+    def _detect_near(self, gray, box):
+        x, y, w, h = box
+        margin = int(max(w, h) * self.search_margin)
+        frame_h, frame_w = gray.shape[:2]
+        x0, y0 = max(0, x - margin), max(0, y - margin)
+        x1, y1 = min(frame_w, x + w + margin), min(frame_h, y + h + margin)
+        # The face cannot change size much between two frames.
+        min_side = max(self.min_face_size // 2, int(min(w, h) * 0.7))
+        max_side = int(max(w, h) * 1.4)
+        faces = self.face_cascade.detectMultiScale(gray[y0:y1, x0:x1], scaleFactor=1.1, minNeighbors=4,
+                                                   minSize=(min_side, min_side),
+                                                   maxSize=(max_side, max_side))
+        return [(int(fx) + x0, int(fy) + y0, int(fw), int(fh)) for (fx, fy, fw, fh) in faces]
+
+    def detect(self, gray):
+        """
+        Returns the face boxes (x, y, w, h) found in a full-resolution grayscale frame.
+        While tracking, only the face closest to the last one is returned.
+        """
+        faces = []
+        if self.last_box is not None and self.frames_since_full < self.full_detect_interval:
+            faces = self._detect_near(gray, self.last_box)
+            self.frames_since_full += 1
+        if not faces:
+            faces = self._detect_full(gray)
+            self.frames_since_full = 1
+
+        if not faces:
+            self.last_box = None
+            return []
+        # Track the largest face, which is usually the person in front of the robot.
+        faces.sort(key=lambda f: f[2] * f[3], reverse=True)
+        self.last_box = faces[0]
+        return faces
 
 class FaceRecognizer:
     """
     A class to handle all face recognition tasks, including training the model
     and recognizing faces from a live camera feed.
     """
-    def __init__(self, dataset_path='known_faces', trainer_path='trainer'):
+    def __init__(self, dataset_path='known_faces', trainer_path='trainer', workers=None):
         """
         Initializes the FaceRecognizer with paths and loads the face detector.
         
         Args:
             dataset_path (str): Path to the directory containing subdirectories of face images.
             trainer_path (str): Path to the directory where the trained model will be saved.
+            workers (int): Processes used to decode images during training.
+                Defaults to the number of CPU cores; 1 disables the pool.
         """
         self.dataset_path = dataset_path
         self.trainer_path = trainer_path
         self.model_path = os.path.join(self.trainer_path, 'trained_model.yml')
         self.labels_path = os.path.join(self.trainer_path, 'labels.pkl')
+        self.cache_path = os.path.join(self.trainer_path, 'roi_cache.pkl')
+        # Memory-mapped copy of the model, loaded at boot instead of the YAML file
+        self.binary_model_path = os.path.join(self.trainer_path, 'model')
+        self.workers = workers or os.cpu_count() or 1
         
         # Use the LBPH (Local Binary Patterns Histograms) recognizer
         self.recognizer = cv2.face.LBPHFaceRecognizer_create()
         # Load the pre-built Haar cascade for frontal face detection
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        self.cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        self.face_cascade = cv2.CascadeClassifier(self.cascade_path)
         
         self.labels = {}
+        self.matcher = None
 
-    def train(self):
+    def _scan_dataset(self):
+        """
+        Lists every training image in the dataset directory.
+
+        Returns:
+            list: Sorted (path, label, mtime, size) tuples, one per image.
+        """
+        entries = []
+        for root, dirs, files in os.walk(self.dataset_path):
+            for file in files:
+                if file.endswith(("png", "jpg", "jpeg")):
+                    path = os.path.join(root, file)
+                    label = os.path.basename(root).replace(" ", "-").lower()
+                    stat = os.stat(path)
+                    entries.append((path, label, stat.st_mtime_ns, stat.st_size))
+        return sorted(entries)
+
+    def _extract_all_rois(self, paths):
+        """
+        Decodes and runs face detection on each image, fanning the work out
+        over a process pool when more than one worker is configured.
+
+        Returns:
+            list: The face crops for each path, in the same order as `paths`.
+        """
+        workers = min(self.workers, len(paths))
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=_worker_context(),
+                                         initializer=_init_worker, initargs=(self.cascade_path,)) as pool:
+                    # map() yields results in input order, so the merge is deterministic.
+                    return list(pool.map(_extract_rois_worker, paths, chunksize=4))
+            except Exception as e:
+                print(f"[WARNING] Parallel decoding failed, falling back to a single process: {e}")
+        return [_extract_rois(self.face_cascade, path) for path in paths]
+
+    def _load_roi_cache(self):
+        """
+        Loads the ROI cache from disk. The cache maps each image path to its
+        mtime, size, label and extracted face crops, plus the set of
+        (path, mtime, size) keys the saved model was trained on.
+        """
+        empty = {'version': ROI_CACHE_VERSION, 'images': {}, 'trained': set()}
+        if not os.path.exists(self.cache_path):
+            return empty
+        try:
+            with open(self.cache_path, 'rb') as f:
+                cache = pickle.load(f)
+        except Exception as e:
+            print(f"[WARNING] Could not read ROI cache, rebuilding it: {e}")
+            return empty
+        if cache.get('version') != ROI_CACHE_VERSION:
+            return empty
+        return cache
+
+    def _save_roi_cache(self, cache):
+        os.makedirs(self.trainer_path, exist_ok=True)
+        tmp_path = self.cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_path)
+
+    def _load_label_ids(self):
+        """Returns the saved {name: id} mapping, or an empty dict."""
+        if not os.path.exists(self.labels_path):
+            return {}
+        with open(self.labels_path, 'rb') as f:
+            return {v: k for k, v in pickle.load(f).items()}
+
+    def train(self, force=False):
         """
         Trains the face recognizer model on the images in the dataset directory.
         The dataset directory should contain one subdirectory for each person,
         named with the person's name.
+
+        Face crops are cached in the trainer directory keyed by image path,
+        mtime and size, so only new or changed images are decoded. When images
+        were only added since the last training, the saved model is extended
+        with LBPHFaceRecognizer.update() instead of being rebuilt.
+
+        Args:
+            force (bool): Ignore the saved model and retrain from every cached crop.
         """
         if not os.path.exists(self.dataset_path):
             print(f"[ERROR] Dataset directory not found at '{self.dataset_path}'")
             return False
 
         print("[INFO] Starting model training...")
+        cache = self._load_roi_cache()
+        cached_images = cache['images']
+        images = {}
+        stale = []
+
+        for path, label, mtime, size in self._scan_dataset():
+            entry = cached_images.get(path)
+            if entry is None or entry['mtime'] != mtime or entry['size'] != size:
+                entry = {'mtime': mtime, 'size': size, 'rois': []}
+                stale.append(path)
+            entry['label'] = label
+            images[path] = entry
+
+        for path, rois in zip(stale, self._extract_all_rois(stale)):
+            images[path]['rois'] = rois
+        print(f"[INFO] Decoded {len(stale)} new or changed images, {len(images) - len(stale)} reused from cache.")
+
+        current_keys = {(path, e['mtime'], e['size']) for path, e in images.items()}
+        present_labels = {e['label'] for e in images.values() if e['rois']}
+
+        # Keep existing ids stable so an incremental update stays consistent.
+        label_ids = {k: v for k, v in self._load_label_ids().items() if k in present_labels}
+        next_id = max(label_ids.values(), default=-1) + 1
+        for label in sorted(present_labels - set(label_ids)):
+            label_ids[label] = next_id
+            next_id += 1
+
+        incremental = (
+            not force
+            and os.path.exists(self.model_path)
+            and os.path.exists(self.labels_path)
+            and cache['trained']
+            and cache['trained'] <= current_keys
+        )
+        keys_to_train = current_keys - cache['trained'] if incremental else current_keys
+
         faces = []
         ids = []
-        label_ids = {}
-        current_id = 0
+        for path, mtime, size in sorted(keys_to_train):
+            entry = images[path]
+            for roi in entry['rois']:
+                faces.append(roi)
+                ids.append(label_ids[entry['label']])
 
-        for root, dirs, files in os.walk(self.dataset_path):
-            for file in files:
-                if file.endswith(("png", "jpg", "jpeg")):
-                    path = os.path.join(root, file)
-                    label = os.path.basename(root).replace(" ", "-").lower()
-
-                    if label not in label_ids:
-                        label_ids[label] = current_id
-                        current_id += 1
-                    
-                    id_ = label_ids[label]
-                    
-                    # Load the image and convert to grayscale
-                    image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
-                    if image is None:
-                        continue
-                    
-                    # Detect faces in the image
-                    detected_faces = self.face_cascade.detectMultiScale(image, scaleFactor=1.1, minNeighbors=5)
-                    for (x, y, w, h) in detected_faces:
-                        roi = image[y:y+h, x:x+w]
-                        faces.append(roi)
-                        ids.append(id_)
+        cache['images'] = images
+        if incremental and not faces:
+            cache['trained'] = current_keys
+            self._save_roi_cache(cache)
+            print("[INFO] Trained model is already up to date.")
+            return True
 
         if not faces:
             print("[ERROR] No faces found in the dataset to train. Please populate the 'known_faces' directory.")
@@ -78,15 +304,39 @@ class FaceRecognizer:
         with open(self.labels_path, 'wb') as f:
             pickle.dump({v: k for k, v in label_ids.items()}, f)
 
-        # Train the recognizer and save the model
-        self.recognizer.train(faces, np.array(ids))
+        if incremental:
+            # Only new images were added: extend the saved model in place.
+            self.recognizer.read(self.model_path)
+            self.recognizer.update(faces, np.array(ids))
+        else:
+            self.recognizer.train(faces, np.array(ids))
         self.recognizer.save(self.model_path)
-        print(f"[INFO] Training complete. {len(np.unique(ids))} faces trained.")
+        save_model(self.binary_model_path, LBPHMatcher.from_recognizer(self.recognizer),
+                   {v: k for k, v in label_ids.items()})
+
+        cache['trained'] = current_keys
+        self._save_roi_cache(cache)
+        mode = "updated with" if incremental else "trained on"
+        print(f"[INFO] Training complete. Model {mode} {len(faces)} face crops, {len(label_ids)} faces known.")
         return True
 
     def load_trained_model(self):
-        """Loads the trained model and labels from disk."""
-        if not os.path.exists(self.model_path) or not os.path.exists(self.labels_path):
+        """
+        Loads the trained model and labels from disk. The memory-mapped binary
+        model is preferred; a YAML model newer than it is loaded instead and
+        converted so the next start is fast.
+        """
+        binary_mtime = model_mtime(self.binary_model_path)
+        yaml_mtime = os.path.getmtime(self.model_path) if os.path.exists(self.model_path) else None
+        if binary_mtime is not None and (yaml_mtime is None or binary_mtime >= yaml_mtime):
+            matcher, labels = load_model(self.binary_model_path)
+            if matcher is not None:
+                self.matcher = matcher
+                self.labels = labels
+                print("[INFO] Trained model and labels loaded successfully.")
+                return True
+
+        if yaml_mtime is None or not os.path.exists(self.labels_path):
             print("[WARNING] Trained model not found. Please run the training first.")
             return False
         
@@ -94,19 +344,49 @@ class FaceRecognizer:
         with open(self.labels_path, 'rb') as f:
             # Load the labels: {0: 'person_a', 1: 'person_b', ...}
             self.labels = pickle.load(f)
+        self.matcher = LBPHMatcher.from_recognizer(self.recognizer)
+        save_model(self.binary_model_path, self.matcher, self.labels)
         print("[INFO] Trained model and labels loaded successfully.")
         return True
 
-    def recognize_face(self, cam_index=0, timeout=10, required_recognitions=5, confidence_threshold=75):
+    def predict_batch(self, rois, k=3):
+        """
+        Scores many face ROIs at once against every known person.
+
+        Args:
+            rois (list): Grayscale face crops.
+            k (int): How many of the closest labels to return per ROI.
+
+        Returns:
+            list: For each ROI, up to k (label_id, distance) pairs, closest first.
+        """
+        if self.matcher is None:
+            # No histograms loaded yet: fall back to OpenCV's single best match.
+            return [[self.recognizer.predict(roi)] for roi in rois]
+        return self.matcher.predict_batch(rois, k)
+
+    def create_tracker(self, **options):
+        """Returns a FaceTracker that shares this recognizer's face detector."""
+        return FaceTracker(self.face_cascade, **options)
+
+    def recognize_face(self, cam_index=0, timeout=10, required_recognitions=5, confidence_threshold=75,
+                       fast_detection=True, camera=None, vote_window=7):
         """
         Recognizes a face from the camera feed. Requires multiple confident
-        matches before returning a name.
+        matches within a sliding window of recent predictions before
+        returning a name.
 
         Args:
             cam_index (int): The index of the camera to use.
             timeout (int): How many seconds to search for a face.
-            required_recognitions (int): How many consecutive matches are needed.
+            required_recognitions (int): How many matches of the same person the
+                vote window must contain.
             confidence_threshold (int): A value from 0-100. Lower is more confident.
+            fast_detection (bool): Detect on downscaled frames and track the last
+                face between full detections instead of scanning every full frame.
+            camera (CameraStream): An already running stream to read from. When
+                omitted, one is opened on `cam_index` and stopped afterwards.
+            vote_window (int): Number of recent face predictions that are voted over.
 
         Returns:
             str: The name of the recognized person, or None if not recognized.
@@ -115,56 +395,57 @@ class FaceRecognizer:
             print("[ERROR] No labels loaded. Cannot recognize faces.")
             return None
 
-        cap = cv2.VideoCapture(cam_index)
-        if not cap.isOpened():
-            print(f"[ERROR] Cannot open camera at index {cam_index}")
-            return None
+        own_camera = camera is None
+        if own_camera:
+            camera = CameraStream(cam_index)
+            if not camera.start():
+                return None
 
         print("[INFO] Looking for a known face...")
         start_time = time.time()
-        last_recognized_id = -1
-        recognition_count = 0
+        votes = deque(maxlen=max(vote_window, required_recognitions))
+        tracker = self.create_tracker() if fast_detection else None
 
         while time.time() - start_time < timeout:
-            ret, frame = cap.read()
-            if not ret:
+            frame = camera.get_latest_frame()
+            if frame is None:
+                if camera.is_running():
+                    continue
                 break
             
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5)
+            if tracker:
+                faces = tracker.detect(gray)
+            else:
+                faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5)
 
-            for (x, y, w, h) in faces:
-                roi_gray = gray[y:y+h, x:x+w]
-                id_, confidence = self.recognizer.predict(roi_gray)
+            rois = [gray[y:y+h, x:x+w] for (x, y, w, h) in faces]
+            for candidates in self.predict_batch(rois, k=1):
+                id_, confidence = candidates[0]
 
                 # A confidence of 0 is a perfect match.
                 if confidence < confidence_threshold:
-                    name = self.labels.get(id_, "Unknown")
-                    print(f"[DEBUG] Potential match: {name} with confidence {confidence:.2f}")
-
-                    if id_ == last_recognized_id:
-                        recognition_count += 1
-                    else:
-                        last_recognized_id = id_
-                        recognition_count = 1 # Reset count for new person
-                    
-                    if recognition_count >= required_recognitions:
-                        print(f"[SUCCESS] Confidently recognized: {name}")
-                        cap.release()
-                        cv2.destroyAllWindows()
-                        return name
+                    print(f"[DEBUG] Potential match: {self.labels.get(id_, 'Unknown')} with confidence {confidence:.2f}")
+                    votes.append(id_)
                 else:
-                    # If confidence is too low, reset the counter
-                    recognition_count = 0
-                    last_recognized_id = -1
+                    votes.append(None)
+
+            ranked = Counter(v for v in votes if v is not None).most_common(1)
+            if ranked and ranked[0][1] >= required_recognitions:
+                name = self.labels.get(ranked[0][0], "Unknown")
+                print(f"[SUCCESS] Confidently recognized: {name}")
+                if own_camera:
+                    camera.stop()
+                return name
 
             # Optional: Display the camera feed for debugging
+            # (also call cv2.destroyAllWindows() before returning; headless builds lack it)
             # cv2.imshow('Face Recognition', frame)
             # if cv2.waitKey(1) & 0xFF == ord('q'):
             #     break
 
-        cap.release()
-        cv2.destroyAllWindows()
+        if own_camera:
+            camera.stop()
         print("[INFO] No face was confidently recognized within the time limit.")
         return None
 
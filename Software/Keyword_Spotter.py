@@ -0,0 +1,199 @@
+import os
+import threading
+import wave
+import numpy as np
+from .Voice_Activity import PhraseSegmenter
+
+def _mel_filterbank(sample_rate, n_fft, n_filters):
+    mel = lambda hz: 2595 * np.log10(1 + hz / 700)
+    hz = lambda m: 700 * (10 ** (m / 2595) - 1)
+    points = hz(np.linspace(mel(0), mel(sample_rate / 2), n_filters + 2))
+    bins = np.floor((n_fft + 1) * points / sample_rate).astype(int)
+    bank = np.zeros((n_filters, n_fft // 2 + 1), dtype=np.float32)
+    for i in range(n_filters):
+        left, center, right = bins[i], bins[i + 1], bins[i + 2]
+        if center > left:
+            bank[i, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[i, center:right] = (right - np.arange(center, right)) / (right - center)
+    return bank
+
+def _dct_matrix(n_filters, n_coeffs):
+    n = np.arange(n_filters)
+    return np.cos(np.pi / n_filters * (n + 0.5)[None, :] * np.arange(n_coeffs)[:, None]).astype(np.float32)
+
+class FeatureExtractor:
+    """MFCCs with per-utterance mean normalization, in plain NumPy."""
+    def __init__(self, sample_rate=16000, frame_seconds=0.025, hop_seconds=0.010, n_filters=26, n_coeffs=13):
+        self.frame_length = int(sample_rate * frame_seconds)
+        self.hop = int(sample_rate * hop_seconds)
+        self.n_fft = 1 << (self.frame_length - 1).bit_length()
+        self.window = np.hamming(self.frame_length).astype(np.float32)
+        self.filterbank = _mel_filterbank(sample_rate, self.n_fft, n_filters)
+        self.dct = _dct_matrix(n_filters, n_coeffs)
+
+    def __call__(self, data):
+        """Returns a (frames, coefficients) array for 16-bit mono PCM bytes."""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        samples = np.append(samples[0:1], samples[1:] - 0.97 * samples[:-1]) if len(samples) else samples
+        if len(samples) < self.frame_length:
+            samples = np.pad(samples, (0, self.frame_length - len(samples)))
+        count = 1 + (len(samples) - self.frame_length) // self.hop
+        index = np.arange(self.frame_length)[None, :] + self.hop * np.arange(count)[:, None]
+        spectrum = np.abs(np.fft.rfft(samples[index] * self.window, self.n_fft)) ** 2
+        features = np.log(spectrum @ self.filterbank.T + 1e-6) @ self.dct.T
+        return features - features.mean(axis=0)
+
+def dtw_distance(a, b):
+    """
+    Length-normalized DTW distance between two feature sequences. Each step
+    advances (1, 1), (1, 2) or (2, 1) frames, so one sequence may be at most
+    twice as fast as the other; returns inf for pairs further apart in length.
+    """
+    n, m = len(a), len(b)
+    if n > 2 * m or m > 2 * n:
+        return float('inf')
+    cost = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2))
+    total = np.full((n, m), np.inf)
+    total[0, 0] = cost[0, 0]
+    for i in range(1, n):
+        best = np.full(m, np.inf)
+        best[1:] = total[i - 1, :-1]
+        best[2:] = np.minimum(best[2:], total[i - 1, :-2])
+        if i >= 2:
+            best[1:] = np.minimum(best[1:], total[i - 2, :-1])
+        total[i] = cost[i] + best
+    return total[-1, -1] / (n + m)
+
+class KeywordSpotter:
+    """
+    Recognizes a small, fixed vocabulary offline by comparing audio with
+    recorded examples of each keyword (MFCC features matched with DTW).
+    Examples live in `template_dir/<lang>/<keyword>/*.wav` and are recorded
+    with `python -m Software.enroll_keywords`.
+
+    Each keyword's acceptance threshold is derived from how far apart its
+    own examples are, so it adapts to the speaker and the microphone.
+    """
+    def __init__(self, template_dir='keyword_templates', sample_rate=16000, default_threshold=6.0, tolerance=1.3):
+        """
+        Args:
+            template_dir (str): Directory with the recorded examples.
+            sample_rate (int): Sample rate of the audio that will be matched.
+            default_threshold (float): Threshold for keywords with a single example.
+            tolerance (float): Multiplier on the largest distance between a keyword's own examples.
+        """
+        self.template_dir = template_dir
+        self.sample_rate = sample_rate
+        self.default_threshold = default_threshold
+        self.tolerance = tolerance
+        self.features = FeatureExtractor(sample_rate)
+        self.templates = {}    # lang -> {keyword: [feature arrays]}
+        self.thresholds = {}   # (lang, keyword) -> distance
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.load()
+
+    def load(self):
+        """Loads every recorded example; a missing directory just means no keywords."""
+        self.templates = {}
+        self.thresholds = {}
+        if not os.path.isdir(self.template_dir):
+            return
+        for lang in sorted(os.listdir(self.template_dir)):
+            lang_dir = os.path.join(self.template_dir, lang)
+            if not os.path.isdir(lang_dir):
+                continue
+            for keyword in sorted(os.listdir(lang_dir)):
+                keyword_dir = os.path.join(lang_dir, keyword)
+                if not os.path.isdir(keyword_dir):
+                    continue
+                examples = [self.features(read_pcm(os.path.join(keyword_dir, file)))
+                            for file in sorted(os.listdir(keyword_dir)) if file.endswith('.wav')]
+                if examples:
+                    self.templates.setdefault(lang, {})[keyword] = examples
+                    self.thresholds[(lang, keyword)] = self._threshold(examples)
+        if self.templates:
+            counts = ", ".join(f"{lang}: {len(words)}" for lang, words in self.templates.items())
+            print(f"[Keywords] Loaded offline keywords ({counts}).")
+
+    def _threshold(self, examples):
+        if len(examples) < 2:
+            return self.default_threshold
+        spread = max(dtw_distance(a, b) for i, a in enumerate(examples) for b in examples[i + 1:])
+        return spread * self.tolerance if np.isfinite(spread) else self.default_threshold
+
+    def has_keywords(self, lang, keywords):
+        """True if at least one of `keywords` has recorded examples in `lang`."""
+        known = self.templates.get(lang, {})
+        return any(keyword in known for keyword in keywords)
+
+    def missing_keywords(self, lang, keywords):
+        """The ones among `keywords` without recorded examples in `lang`."""
+        known = self.templates.get(lang, {})
+        return [keyword for keyword in keywords if keyword not in known]
+
+    def match(self, data, lang, keywords=None):
+        """
+        Compares a phrase with the examples of `keywords` (all of the
+        language's keywords if None).
+
+        Returns:
+            str: The best matching keyword within its threshold, or None.
+        """
+        candidates = self.templates.get(lang, {})
+        if keywords is not None:
+            candidates = {k: v for k, v in candidates.items() if k in keywords}
+        if not candidates:
+            return None
+        features = self.features(data)
+        best, best_score = None, 1.0
+        for keyword, examples in candidates.items():
+            distance = min(dtw_distance(features, example) for example in examples)
+            # Score relative to the keyword's own threshold, so keywords are comparable.
+            score = distance / self.thresholds[(lang, keyword)]
+            if score < best_score:
+                best, best_score = keyword, score
+        return best
+
+    def start(self, audio_stream, lang, keywords, on_keyword, pause_threshold=0.3, max_seconds=1.5):
+        """
+        Starts spotting `keywords` continuously on the shared microphone
+        stream and calls `on_keyword(keyword)` from the background thread for
+        each one heard. Short pauses keep the reaction within a few hundred
+        milliseconds of the end of the word.
+        """
+        self.stop()
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self._spot_loop,
+            args=(audio_stream, lang, keywords, on_keyword, pause_threshold, max_seconds),
+            daemon=True,
+        )
+        self.thread.start()
+
+    def _spot_loop(self, audio_stream, lang, keywords, on_keyword, pause_threshold, max_seconds):
+        reader = audio_stream.reader()
+        segmenter = PhraseSegmenter(audio_stream.vad, audio_stream.chunk_seconds, pause_threshold, max_seconds)
+        while not self.stop_event.is_set():
+            chunk = reader.read(timeout=0.1)
+            if chunk is None:
+                continue
+            phrase = segmenter.feed(*chunk, audio_stream.energy_threshold)
+            if phrase is None:
+                continue
+            keyword = self.match(phrase, lang, keywords)
+            if keyword:
+                print(f"[Keywords] Heard '{keyword}'.")
+                on_keyword(keyword)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+def read_pcm(path):
+    """Returns the 16-bit PCM frames of a WAV file written by enroll_keywords."""
+    with wave.open(path, 'rb') as wav:
+        return wav.readframes(wav.getnframes())
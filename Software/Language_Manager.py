@@ -1,5 +1,6 @@
 
-from .Tts_Player import play_tts, wait_until_finished
+from .Tts_Player import play_tts
+from .Phrases import phrase
 
 class LanguageManager:
     def __init__(self):
@@ -10,10 +11,10 @@ class LanguageManager:
         }
     
     def set_language(self, lang):
+        """Switches the language and starts the spoken confirmation without waiting for it to end."""
         self.current_lang = lang
-        msg = "ভাষা বাংলা তে পরিবর্তন করা হয়েছে" if lang == "bn" else "Language changed to English"
+        msg = phrase('language_changed', lang)
         play_tts(msg, lang)
-        wait_until_finished()
 
     def check_language_change(self, text):
         text_lower = text.lower()
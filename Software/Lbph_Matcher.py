@@ -0,0 +1,157 @@
+import numpy as np
+
+class LBPHMatcher:
+    """
+    A NumPy re-implementation of OpenCV's LBPH prediction that scores many
+    face ROIs at once. Histograms are computed exactly as
+    cv2.face.LBPHFaceRecognizer does, and chi-square distances against every
+    stored histogram are evaluated as one array operation, so a batch of
+    ROIs costs little more than a single predict() call.
+    """
+    def __init__(self, histograms_by_bin, labels, radius=1, neighbors=8, grid_x=8, grid_y=8,
+                 stored_totals=None):
+        """
+        Args:
+            histograms_by_bin (numpy.ndarray): Stored histograms in bin-major layout,
+                one column per training ROI. Gathering the bins of one query then
+                reads contiguous rows, and a memory-mapped array can be used as is.
+            labels (numpy.ndarray): The label id of each stored histogram.
+            radius, neighbors, grid_x, grid_y (int): LBPH parameters the histograms
+                were computed with.
+            stored_totals (numpy.ndarray): Per-histogram sums, if already known.
+        """
+        self.histograms_by_bin = histograms_by_bin
+        self.labels = np.asarray(labels, dtype=np.int32).reshape(-1)
+        self.radius = radius
+        self.neighbors = neighbors
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self.unique_labels = np.unique(self.labels)
+        if stored_totals is None:
+            stored_totals = histograms_by_bin.sum(axis=0, dtype=np.float64)
+        self.stored_totals = np.asarray(stored_totals, dtype=np.float64)
+        self._sample_offsets = self._compute_sample_offsets()
+
+    @property
+    def histograms(self):
+        """The stored histograms, one row per training ROI."""
+        return self.histograms_by_bin.T
+
+    @classmethod
+    def from_recognizer(cls, recognizer):
+        """Builds a matcher from a trained cv2.face.LBPHFaceRecognizer."""
+        histograms = recognizer.getHistograms()
+        if not histograms:
+            raise ValueError("The recognizer has not been trained.")
+        return cls(
+            np.ascontiguousarray(np.vstack([h.reshape(1, -1) for h in histograms]).T, dtype=np.float32),
+            recognizer.getLabels(),
+            radius=recognizer.getRadius(),
+            neighbors=recognizer.getNeighbors(),
+            grid_x=recognizer.getGridX(),
+            grid_y=recognizer.getGridY(),
+        )
+
+    def _compute_sample_offsets(self):
+        """Bilinear sampling offsets and weights for each circular neighbour."""
+        offsets = []
+        for n in range(self.neighbors):
+            angle = 2.0 * np.pi * n / float(self.neighbors)
+            x = np.float32(self.radius * np.cos(angle))
+            y = np.float32(-self.radius * np.sin(angle))
+            fx, fy = int(np.floor(x)), int(np.floor(y))
+            cx, cy = int(np.ceil(x)), int(np.ceil(y))
+            tx, ty = x - np.float32(fx), y - np.float32(fy)
+            one = np.float32(1)
+            weights = ((one - tx) * (one - ty), tx * (one - ty), (one - tx) * ty, tx * ty)
+            offsets.append((fx, fy, cx, cy, weights))
+        return offsets
+
+    def _lbp_image(self, roi):
+        src = np.asarray(roi, dtype=np.float32)
+        r = self.radius
+        rows, cols = src.shape
+        if rows <= 2 * r or cols <= 2 * r:
+            return np.zeros((0, 0), dtype=np.int32)
+
+        def shifted(dy, dx):
+            return src[r + dy:rows - r + dy, r + dx:cols - r + dx]
+
+        center = shifted(0, 0)
+        codes = np.zeros(center.shape, dtype=np.int32)
+        eps = np.finfo(np.float32).eps
+        for n, (fx, fy, cx, cy, (w1, w2, w3, w4)) in enumerate(self._sample_offsets):
+            t = w1 * shifted(fy, fx) + w2 * shifted(fy, cx) + w3 * shifted(cy, fx) + w4 * shifted(cy, cx)
+            codes |= (((t > center) | (np.abs(t - center) < eps)).astype(np.int32) << n)
+        return codes
+
+    def compute_histograms(self, rois):
+        """
+        Computes the spatial LBP histogram of each grayscale ROI.
+
+        Returns:
+            numpy.ndarray: A (len(rois), grid_x * grid_y * 2**neighbors) float32 array.
+        """
+        patterns = 2 ** self.neighbors
+        cells = self.grid_x * self.grid_y
+        result = np.zeros((len(rois), cells * patterns), dtype=np.float32)
+        for index, roi in enumerate(rois):
+            codes = self._lbp_image(roi)
+            height, width = codes.shape[0] // self.grid_y, codes.shape[1] // self.grid_x
+            if height == 0 or width == 0:
+                continue
+            # Crop to whole cells and give every pixel the index of its cell.
+            codes = codes[:height * self.grid_y, :width * self.grid_x]
+            cell_rows = np.repeat(np.arange(self.grid_y), height)[:, None]
+            cell_cols = np.repeat(np.arange(self.grid_x), width)[None, :]
+            bins = (cell_rows * self.grid_x + cell_cols) * patterns + codes
+            counts = np.bincount(bins.ravel(), minlength=cells * patterns)
+            result[index] = counts.astype(np.float32) / np.float32(height * width)
+        return result
+
+    def distances(self, query):
+        """
+        Chi-square (HISTCMP_CHISQR_ALT) distances between query histograms and
+        every stored histogram.
+
+        Returns:
+            numpy.ndarray: A (len(query), len(self.histograms)) array.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        out = np.empty((len(query), len(self.labels)), dtype=np.float64)
+        for i, q in enumerate(query):
+            # (a-b)^2/(a+b) == a + b - 4ab/(a+b), and ab is zero wherever the query
+            # bin is empty, so only the query's non-zero bins need to be visited.
+            support = np.flatnonzero(q)
+            a = q[support, None]
+            b = self.histograms_by_bin[support]
+            shared = (a * b / (a + b)).sum(axis=0, dtype=np.float64)
+            out[i] = 2.0 * (self.stored_totals + float(a.sum(dtype=np.float64)) - 4.0 * shared)
+        return out
+
+    def predict_batch(self, rois, k=3):
+        """
+        Scores a batch of ROIs against every known person.
+
+        Args:
+            rois (list): Grayscale face crops, of any size.
+            k (int): How many of the closest labels to return per ROI.
+
+        Returns:
+            list: For each ROI, up to k (label_id, distance) pairs, closest first.
+                The distance of a label is that of its nearest stored histogram.
+        """
+        if not rois:
+            return []
+        dist = self.distances(self.compute_histograms(rois))
+        # Nearest stored histogram of each label, for every ROI at once.
+        per_label = np.stack([dist[:, self.labels == label].min(axis=1) for label in self.unique_labels], axis=1)
+        order = np.argsort(per_label, axis=1)[:, :k]
+        return [
+            [(int(self.unique_labels[j]), float(per_label[i, j])) for j in order[i]]
+            for i in range(len(rois))
+        ]
+
+    def predict(self, roi):
+        """Drop-in replacement for LBPHFaceRecognizer.predict(): returns (label_id, distance)."""
+        return self.predict_batch([roi], k=1)[0][0]
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+The fixed phrases the robot speaks, in one place so they can be
+synthesized ahead of time. `{name}` is the user's name as recognized,
+`{title}` the same name capitalized.
+"""
+
+PHRASES = {
+    'unknown_user': {
+        'en': "I don't recognize you, but I will assist you anyway.",
+    },
+    'ready': {
+        'en': "Hello, {title}. I am ready.",
+        'bn': "হ্যালো {name}! আমি প্রস্তুত।",
+    },
+    'goodbye': {
+        'en': "Goodbye! Stay well",
+        'bn': "বিদায়! ভালো থাকবেন",
+    },
+    'my_name': {
+        'en': "My name is Assist AI, and you're {name}.",
+        'bn': "আমার নাম Assist AI, আর আপনি {name}।",
+    },
+    'hello': {
+        'en': "Hello {name}! How can I assist you today?",
+        'bn': "হ্যালো {name}! আমি আপনাকে কিভাবে সাহায্য করতে পারি?",
+    },
+    'creators': {
+        'en': "Goutom Roy, Ayush Das, Mahamudul, and Toma",
+        'bn': "গৌতম রায়, আয়ুষ দাস, মাহমুদুল, এবং টোমা",
+    },
+    'language_changed': {
+        'en': "Language changed to English",
+        'bn': "ভাষা বাংলা তে পরিবর্তন করা হয়েছে",
+    },
+}
+
+def phrase(key, lang, user_name=""):
+    """Returns the phrase `key` in `lang` with the user's name filled in."""
+    return PHRASES[key][lang].format(name=user_name, title=user_name.capitalize())
+
+def fixed_phrases(user_name=None, personal_only=False):
+    """
+    Lists every fixed phrase as (text, lang) pairs. Phrases that mention the
+    user are only included once `user_name` is known; with personal_only,
+    only those are listed.
+    """
+    for templates in PHRASES.values():
+        for lang, template in templates.items():
+            personal = '{name}' in template or '{title}' in template
+            if (personal and not user_name) or (personal_only and not personal):
+                continue
+            yield template.format(name=user_name or "", title=(user_name or "").capitalize()), lang
@@ -0,0 +1,184 @@
+import cv2
+import os
+import threading
+import time
+from collections import Counter, deque
+from queue import Queue, Empty
+from .Camera_Stream import CameraStream
+
+class PresenceService:
+    """
+    Watches the camera in a low duty-cycle background thread and keeps track
+    of who is standing in front of the robot. The current identity can be
+    read at any time without blocking, and arrivals, departures and identity
+    changes are published as events.
+    """
+    def __init__(self, face_recognizer, camera=None, cam_index=0, fps=2.0, busy_fps=0.2,
+                 busy_check=None, max_load_per_core=0.9, window=5, required_votes=3,
+                 unknown_votes=4, confidence_threshold=75, absence_timeout=5.0):
+        """
+        Args:
+            face_recognizer (FaceRecognizer): A recognizer with its model already loaded.
+            camera (CameraStream): A running stream to share. When omitted, one is
+                opened on `cam_index` while the service runs.
+            fps (float): How many frames per second to analyse when the robot is idle.
+            busy_fps (float): Frame rate used while `busy_check()` is true or the CPU is loaded.
+            busy_check (callable): Returns True while the service should back off,
+                e.g. Tts_Player.is_playing so recognition never competes with speech.
+            max_load_per_core (float): 1-minute load average per core above which the
+                service backs off.
+            window (int): Number of recent predictions the identity is voted over.
+            required_votes (int): Confident votes one person needs within the window.
+            unknown_votes (int): Unrecognized predictions within the window needed to
+                demote a recognized person to "Unknown". Higher than `required_votes`,
+                so a few poor frames do not drop a known user.
+            confidence_threshold (int): LBPH distance below which a prediction counts.
+            absence_timeout (float): Seconds without a face before the person is considered gone.
+        """
+        self.face_recognizer = face_recognizer
+        self.camera = camera
+        self.own_camera = camera is None
+        self.cam_index = cam_index
+        self.interval = 1.0 / fps
+        self.busy_interval = 1.0 / busy_fps
+        self.busy_check = busy_check
+        self.max_load = max_load_per_core * (os.cpu_count() or 1)
+        self.votes = deque(maxlen=window)
+        self.required_votes = required_votes
+        self.unknown_votes = unknown_votes
+        self.confidence_threshold = confidence_threshold
+        self.absence_timeout = absence_timeout
+
+        self.events = Queue()
+        self.lock = threading.Lock()
+        self.current_user = None
+        self.present = False
+        self.last_seen = 0.0
+
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def start(self):
+        """Starts the background recognition thread. Returns False if the camera cannot be opened."""
+        if self.thread and self.thread.is_alive():
+            return True
+        if self.own_camera:
+            self.camera = CameraStream(self.cam_index)
+            if not self.camera.start():
+                return False
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """Stops the recognition thread and releases the camera if the service opened it."""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+        if self.own_camera and self.camera:
+            self.camera.stop()
+            self.camera = None
+
+    def get_current_user(self, default=None):
+        """Returns the name of the person currently in front of the robot, or `default`."""
+        with self.lock:
+            if self.present and self.current_user:
+                return self.current_user
+        return default
+
+    def is_present(self):
+        """Returns True while someone's face has been seen within the absence timeout."""
+        with self.lock:
+            return self.present
+
+    def get_event(self):
+        """
+        Returns the next presence event without blocking, or None. Events are
+        tuples: ('arrived', name), ('changed', old_name, new_name) or ('left', name).
+        """
+        try:
+            return self.events.get_nowait()
+        except Empty:
+            return None
+
+    def _is_busy(self):
+        if self.busy_check and self.busy_check():
+            return True
+        try:
+            return os.getloadavg()[0] > self.max_load
+        except (AttributeError, OSError):
+            return False # getloadavg is not available on every platform
+
+    def _run(self):
+        tracker = self.face_recognizer.create_tracker()
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            frame = self.camera.get_latest_frame(timeout=self.interval)
+            if frame is not None:
+                self._process_frame(frame, tracker)
+            elif not self.camera.is_running():
+                print("[Presence] Camera stream ended. Stopping presence service.")
+                break
+            self._check_absence()
+
+            interval = self.busy_interval if self._is_busy() else self.interval
+            self.stop_event.wait(max(0.0, interval - (time.monotonic() - started)))
+
+    def _process_frame(self, frame, tracker):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = tracker.detect(gray)
+        if not faces:
+            return
+
+        x, y, w, h = faces[0]
+        id_, confidence = self.face_recognizer.predict_batch([gray[y:y+h, x:x+w]], k=1)[0][0]
+        self.votes.append(id_ if confidence < self.confidence_threshold else None)
+
+        with self.lock:
+            self.last_seen = time.monotonic()
+            arrived = not self.present
+            self.present = True
+            identified = self.current_user not in (None, "Unknown")
+
+        # A known user is only replaced by a confident vote for someone else,
+        # or demoted once most of the window is unrecognized.
+        name = None
+        ranked = Counter(v for v in self.votes if v is not None).most_common(1)
+        unrecognized = sum(1 for v in self.votes if v is None)
+        if ranked and ranked[0][1] >= self.required_votes:
+            name = self.face_recognizer.labels.get(ranked[0][0], "Unknown")
+        elif unrecognized >= self.unknown_votes:
+            name = "Unknown"
+        elif not identified and len(self.votes) == self.votes.maxlen:
+            name = "Unknown"
+
+        if arrived and name is None:
+            return # Wait for enough votes before announcing the arrival
+        self._publish(name, arrived)
+
+    def _publish(self, name, arrived):
+        with self.lock:
+            previous = self.current_user
+            if name is None or (name == previous and not arrived):
+                return
+            self.current_user = name
+        if arrived or previous is None:
+            print(f"[Presence] {name} arrived.")
+            self.events.put(('arrived', name))
+        elif name != previous:
+            print(f"[Presence] {previous} was replaced by {name}.")
+            self.events.put(('changed', previous, name))
+
+    def _check_absence(self):
+        with self.lock:
+            if not self.present or time.monotonic() - self.last_seen < self.absence_timeout:
+                return
+            self.present = False
+            name = self.current_user
+            self.current_user = None
+        self.votes.clear()
+        if name:
+            print(f"[Presence] {name} left.")
+            self.events.put(('left', name))
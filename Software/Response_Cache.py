@@ -0,0 +1,145 @@
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# Queries whose answer goes stale quickly get a shorter lifetime; 0 means never cache.
+VOLATILE_TTLS = [
+    (("time", "date", "today", "সময়", "তারিখ", "আজ"), 0),
+    (("weather", "temperature", "news", "আবহাওয়া", "তাপমাত্রা", "খবর"), 15 * 60),
+]
+
+# Words that make a query depend on what was said before it.
+FOLLOW_UP_WORDS = {"it", "that", "this", "he", "she", "they", "them", "his", "her", "more", "why", "again",
+                   "এটা", "সেটা", "এটি", "সে", "তারা", "আরো", "আরও", "কেন", "আবার"}
+
+# Words that do not change what is being asked; a fuzzy match ignores them.
+FILLER_WORDS = {"please", "um", "uh", "er", "hmm", "hey", "ok", "okay", "so", "well", "just",
+                "actually", "kindly", "a", "an", "the",
+                "প্লিজ", "আচ্ছা", "একটু", "তো"}
+
+def normalize_query(text):
+    """Lowercases, drops punctuation and collapses whitespace so rephrasings of case and spacing match."""
+    text = unicodedata.normalize('NFC', text).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+def _content_words(query):
+    return [word for word in query.split() if word not in FILLER_WORDS]
+
+class ResponseCache:
+    """
+    Remembers the robot's finished answers (cleaned and translated, split
+    into the sentences that were spoken) so a repeated question skips the
+    AI, translation and, since the sentences are identical, synthesis too.
+
+    Entries are keyed by the user, the normalized query, the language and,
+    for follow-up questions only, the previous question. Answers can draw
+    on the user's own conversation history, so they are never given to
+    someone else. They expire after
+    `ttl` seconds (less for time-sensitive topics) and the least recently
+    used entries are dropped beyond `max_entries`. With `fuzzy`, a query
+    that only differs from a cached one in filler words ("please", "the")
+    also counts as a hit. The remaining words must match exactly and in
+    order, since "2 minus 3" and "3 minus 2" have different answers.
+    """
+    def __init__(self, max_entries=256, ttl=24 * 3600, fuzzy=True, path=None):
+        """
+        Args:
+            max_entries (int): Entries kept before the least recently used are evicted.
+            ttl (float): Seconds an answer stays valid.
+            fuzzy (bool): Also match queries that differ only in filler words.
+            path (str): JSON file to keep the cache in across restarts; None keeps it in memory.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.fuzzy = fuzzy
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # (query, lang, context, user) -> entry dict
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for item in json.load(f):
+                    key = tuple(item['key'])
+                    if len(key) == 4:  # Files from before users were part of the key are skipped.
+                        self.entries[key] = item['entry']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[Response Cache] Ignoring unreadable cache file: {e}")
+            self.entries.clear()
+
+    def _save(self):
+        if not self.path:
+            return
+        items = [{'key': list(key), 'entry': entry} for key, entry in self.entries.items()]
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(items, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[Response Cache] Could not save the cache: {e}")
+
+    def _ttl_for(self, query):
+        words = set(query.split())
+        for keywords, ttl in VOLATILE_TTLS:
+            if any(keyword in words for keyword in keywords):
+                return ttl
+        return self.ttl
+
+    def make_key(self, input_text, lang, previous_input=None, user=None):
+        query = normalize_query(input_text)
+        follow_up = bool(FOLLOW_UP_WORDS & set(query.split()))
+        context = normalize_query(previous_input) if follow_up and previous_input else ""
+        return query, lang, context, user or ""
+
+    def get(self, input_text, lang, previous_input=None, user=None):
+        """
+        Returns the cached entry, a dict with 'english' (the AI's answer) and
+        'sentences' (what was spoken), or None on a miss.
+        """
+        key = self.make_key(input_text, lang, previous_input, user)
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None and self.fuzzy:
+                key, entry = self._closest(key)
+            if entry is not None and entry['expires'] <= now:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def _closest(self, key):
+        query, rest = key[0], key[1:]
+        words = _content_words(query)
+        for other in self.entries:
+            if other[1:] == rest and _content_words(other[0]) == words:
+                return other, self.entries[other]
+        return None, None
+
+    def put(self, input_text, lang, english, sentences, previous_input=None, user=None):
+        """Stores a finished answer, unless its topic is too time-sensitive to cache."""
+        key = self.make_key(input_text, lang, previous_input, user)
+        ttl = self._ttl_for(key[0])
+        if ttl <= 0 or not sentences:
+            return
+        with self.lock:
+            self.entries[key] = {'english': english, 'sentences': list(sentences), 'expires': time.time() + ttl}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self._save()
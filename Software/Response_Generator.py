@@ -1,37 +1,174 @@
-from .AI_Handler import gemini_api
-from .Units import clean_response, translate_text
-import collections
+from .AI_Handler import gemini_api, FALLBACK_RESPONSE, RequestCancelled, RequestFailed
+from .Units import clean_response, translate_text, translate_segments, split_sentences
+from .Phrases import phrase
+from .Tracing import mark, span, record_span
+from .Response_Cache import ResponseCache
+from .Conversation_Memory import ConversationMemory
+import re
+import time
 
-# Use a deque to automatically manage the size of the conversation history
-conversation_history = collections.deque(maxlen=4) # Stores last 4 turns (2 user, 2 AI)
+def _summarize(previous_summary, messages, max_tokens):
+    """Asks the AI to fold older messages into the running conversation summary."""
+    prompt = (f"Summarize this conversation between a user and you, Assist AI, in at most {max_tokens * 3 // 4} "
+              "words. Keep names, facts and open questions; drop small talk. Reply with the summary only.\n\n")
+    if previous_summary:
+        prompt += f"Summary so far: {previous_summary}\n\n"
+    prompt += "\n".join(messages)
+    # Runs in the background while the answer is still being spoken; an interrupt must not cancel it.
+    with span('summarize', messages=len(messages)):
+        return gemini_api(prompt, cancellable=False)
+
+# History per recognized user: recent turns verbatim, older ones summarized in the background.
+conversation_memory = ConversationMemory(summarize=_summarize)
+
+# Finished answers to repeated questions, so they skip the AI and translation.
+response_cache = ResponseCache()
+
+# Where a sentence ends in text that is still streaming in.
+_SENTENCE_END = re.compile(r'[.!?।]\s+')
+
+def _canned_response(input_lower, user_name, current_lang):
+    """Returns the fixed answer to a simple command, or None."""
+    if any(x in input_lower for x in ["your name", "তোমার নাম"]):
+        return phrase('my_name', current_lang, user_name)
+    if any(x in input_lower for x in ["hello", "হ্যালো"]):
+        return phrase('hello', current_lang, user_name)
+    if any(x in input_lower for x in ["creator", "নির্মাতা"]):
+        return phrase('creators', current_lang)
+    return None
+
+def _finish(english_text, current_lang):
+    """Cleans AI text and translates it if necessary."""
+    if current_lang == "bn":
+        return translate_text(clean_response(english_text), 'bn')
+    return clean_response(english_text)
+
+def _finish_all(english_sentences, current_lang):
+    """Cleans sentences and, in Bangla mode, translates them concurrently, yielding them in order."""
+    cleaned = [clean_response(sentence) for sentence in english_sentences]
+    if current_lang == "bn":
+        return translate_segments(cleaned, 'bn')
+    return iter([sentence for sentence in cleaned if sentence])
+
+def _cached_response(input_text, user_name, current_lang):
+    """Returns a cached answer's sentences and records the exchange in history, or None."""
+    cached = response_cache.get(input_text, current_lang, conversation_memory.last_user_input(user_name), user_name)
+    if cached is None:
+        return None
+    mark('response_cache_hit')
+    print("[Response] Answering from cache.")
+    conversation_memory.add_exchange(user_name, input_text, cached['english'])
+    return cached['sentences']
 
 def generate_response(input_text, user_name, current_lang):
     """
     Generates a response, maintaining and using conversation history.
     """
-    global conversation_history
-    
-    input_lower = input_text.lower()
-    
     # Handle hardcoded simple commands first
-    if any(x in input_lower for x in ["your name", "তোমার নাম"]):
-        return f"আমার নাম Assist AI, আর আপনি {user_name}।" if current_lang == "bn" else f"My name is Assist AI, and you're {user_name}."
-    if any(x in input_lower for x in ["hello", "হ্যালো"]):
-        return f"হ্যালো {user_name}! আমি আপনাকে কিভাবে সাহায্য করতে পারি?" if current_lang == "bn" else f"Hello {user_name}! How can I assist you today?"
-    if any(x in input_lower for x in ["creator", "নির্মাতা"]):
-        return "গৌতম রায়, আয়ুষ দাস, মাহমুদুল, এবং টোমা" if current_lang == "bn" else "Goutom Roy, Ayush Das, Mahamudul, and Toma"
-    
+    canned = _canned_response(input_text.lower(), user_name, current_lang)
+    if canned:
+        return canned
+
+    cached = _cached_response(input_text, user_name, current_lang)
+    if cached:
+        return " ".join(cached)
+
     # Generate response using the AI with history
-    history_list = list(conversation_history)
-    english_response = gemini_api(input_text, history=history_list)
-    
+    history_list = conversation_memory.history(user_name)
+    previous_input = conversation_memory.last_user_input(user_name)
+    mark('llm_request')
+    try:
+        with span('llm'):
+            english_response = gemini_api(input_text, history=history_list)
+    except RequestCancelled:
+        return ""
+    except RequestFailed as e:
+        # Spoken, but neither remembered nor cached: the next attempt may work.
+        print(f"[AI Error] {e}")
+        return _finish(FALLBACK_RESPONSE, current_lang)
+    mark('llm_done')
+
     # Add the current exchange to history
-    conversation_history.append(f"User: {input_text}")
-    conversation_history.append(f"AI: {english_response}")
-    
+    conversation_memory.add_exchange(user_name, input_text, english_response)
+
     # Translate if necessary and return
-    if current_lang == "bn":
-        return translate_text(clean_response(english_response), 'bn')
-    else:
-        return clean_response(english_response)
+    response = _finish(english_response, current_lang)
+    response_cache.put(input_text, current_lang, english_response, split_sentences(response), previous_input, user_name)
+    return response
+
+def generate_response_stream(input_text, user_name, current_lang):
+    """
+    Like generate_response, but yields the response one sentence at a time
+    while the AI is still writing it. Each sentence is cleaned and, in
+    Bangla mode, translated as soon as it is complete, so speech can start
+    long before the whole answer has arrived. Meant to be passed straight
+    to play_tts(..., stream=True).
+    """
+    canned = _canned_response(input_text.lower(), user_name, current_lang)
+    if canned:
+        yield canned
+        return
+
+    cached = _cached_response(input_text, user_name, current_lang)
+    if cached:
+        # The same sentences as last time, so their audio is in the TTS cache too.
+        yield from cached
+        return
 
+    history_list = conversation_memory.history(user_name)
+    previous_input = conversation_memory.last_user_input(user_name)
+    spoken = []
+    said = ""  # The English text of the sentences handed out so far
+    mark('llm_request')
+    # Only the time spent waiting for the AI counts; the consumer's time between chunks does not.
+    llm_wait = 0.0
+    pieces = []
+    pending = ""
+    try:
+        chunks = iter(gemini_api(input_text, history=history_list, stream=True))
+        while True:
+            started = time.monotonic()
+            try:
+                chunk = next(chunks, None)
+            finally:
+                llm_wait += time.monotonic() - started
+            if chunk is None:
+                break
+            if not pieces:
+                mark('llm_first_chunk')
+            pieces.append(chunk)
+            pending += chunk
+            # Text up to the last sentence end is complete; the rest may still grow.
+            ends = list(_SENTENCE_END.finditer(pending))
+            if ends and len(pending[:ends[-1].end()].strip()) >= 12:
+                complete, pending = pending[:ends[-1].end()], pending[ends[-1].end():]
+                said += complete
+                for sentence in _finish_all(split_sentences(complete), current_lang):
+                    mark('first_sentence')
+                    spoken.append(sentence)
+                    yield sentence
+        mark('llm_done')
+        said += pending
+        for sentence in _finish_all(split_sentences(pending), current_lang):
+            mark('first_sentence')
+            spoken.append(sentence)
+            yield sentence
+        # Only complete answers are cached, not ones cut off by an interruption or an error.
+        response_cache.put(input_text, current_lang, "".join(pieces), spoken, previous_input, user_name)
+    except RequestCancelled:
+        return
+    except RequestFailed as e:
+        print(f"[AI Error] {e}")
+        if not pieces:
+            yield _finish(FALLBACK_RESPONSE, current_lang)
+            return
+        # Say what did arrive, but leave the broken answer out of the cache.
+        said += pending
+        for sentence in _finish_all(split_sentences(pending), current_lang):
+            yield sentence
+    finally:
+        record_span('llm_stream', llm_wait, chunks=len(pieces))
+        # Also runs when the answer is interrupted: history keeps what was
+        # handed to speech, not text that arrived but was never said.
+        if said.strip():
+            conversation_memory.add_exchange(user_name, input_text, said.strip())
@@ -1,18 +1,33 @@
 import serial
+import threading
 import time
 
-# Configure serial communication with Arduino
-try:
-    arduino = serial.Serial('/dev/ttyACM0', baudrate=9600, timeout=1)
-    print("Arduino connected")
-except Exception as e:
-    print(f"Arduino connection error: {e}")
-    arduino = None
+# The serial connection to the Arduino, opened on first use rather than at
+# import, so processes that only import this module (e.g. training workers)
+# do not claim the port.
+arduino = None
+_connect_attempted = False
+_connect_lock = threading.Lock()
+
+def _connection():
+    global arduino, _connect_attempted
+    with _connect_lock:
+        if not _connect_attempted:
+            _connect_attempted = True
+            # Configure serial communication with Arduino
+            try:
+                arduino = serial.Serial('/dev/ttyACM0', baudrate=9600, timeout=1)
+                print("Arduino connected")
+            except Exception as e:
+                print(f"Arduino connection error: {e}")
+                arduino = None
+    return arduino
 
 def send_to_arduino(command):
     try:
+        arduino = _connection()
         if arduino and arduino.is_open:
             arduino.write(f"{command}\n".encode())
             time.sleep(0.1)  # Small delay for Arduino to process
     except Exception as e:
-        print(f"Arduino write error: {e}")
\ No newline at end of file
+        print(f"Arduino write error: {e}")
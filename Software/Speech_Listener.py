@@ -1,8 +1,14 @@
 import speech_recognition as sr
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from queue import Queue
+from .Audio_Stream import AudioStream
+from .Voice_Activity import VoiceActivityDetector
+from .Keyword_Spotter import KeywordSpotter
+from .Tts_Player import is_playing
 from .Units import play_sound
+from .Tracing import start_turn, mark, span
 from .Face_Display import set_face_state
 
 LISTEN_SOUND = "Resources/listen.mp3"
@@ -13,52 +19,117 @@ class SpeechListener:
     A class to handle speech recognition in non-blocking background threads.
     Now includes a persistent interrupt listener for more robust command interruption.
     """
-    def __init__(self):
+    def __init__(self, event_bus=None, audio_stream=None, keyword_spotter=None, pipelined=False):
+        """
+        Args:
+            event_bus (EventBus): If given, transcriptions are posted to it as
+                'transcribed' events instead of being queued for
+                get_transcribed_text(), and stop words also post 'interrupt'.
+            audio_stream (AudioStream): Shared microphone stream. By default one
+                is opened here and kept open until close().
+            keyword_spotter (KeywordSpotter): Recognizes stop words and commands
+                offline. By default the examples in keyword_templates/ are used;
+                words without examples fall back to cloud recognition.
+            pipelined (bool): Start recognition speculatively at short pauses and
+                play the processing sound without waiting for it.
+        """
+        self.event_bus = event_bus
+        # The microphone stays open for the session; both listeners read from it.
+        # Its voice activity detector keeps noise and the robot's own speech
+        # from being sent to cloud recognition.
+        self.audio_stream = audio_stream or AudioStream(vad=VoiceActivityDetector(echo_check=is_playing))
+        self.audio_stream.start()
+        self.keyword_spotter = keyword_spotter or KeywordSpotter(sample_rate=self.audio_stream.sample_rate)
+
         # Recognizer for main commands
         self.main_recognizer = sr.Recognizer()
-        self.main_recognizer.dynamic_energy_threshold = True
-        self.main_recognizer.pause_threshold = 0.8
+        self.main_pause_threshold = 0.8
+        self.partial_pause_threshold = 0.3
+        self.pipelined = pipelined
+        self.recognition_pool = ThreadPoolExecutor(max_workers=2)
         
-        # A separate, more sensitive recognizer for interruptions
+        # A separate recognizer for interruptions
         self.interrupt_recognizer = sr.Recognizer()
-        self.interrupt_recognizer.dynamic_energy_threshold = True
-        self.interrupt_recognizer.pause_threshold = 0.5 # Quicker to react
+        self.interrupt_pause_threshold = 0.5 # Quicker to react
 
         self.text_queue = Queue()
         self.is_listening = False
         
         # --- Thread control events ---
         self.interrupt_event = threading.Event() # Signals that a stop word was heard
+        self.stop_word_lock = threading.Lock() # The spotter and the cloud loop may both hear one
         self.stop_interrupt_thread = threading.Event() # Signals the interrupt thread to stop completely
         self.interrupt_thread = None
 
-    def _listen_thread(self, language):
+    def _recognize(self, audio, language, commands):
+        """Returns the text of a phrase: fixed commands offline, anything else from the cloud."""
+        text = None
+        if commands:
+            with span('keyword_match'):
+                text = self.keyword_spotter.match(audio.frame_data, language.split('-')[0], commands)
+        if text:
+            print(f"You said (offline): {text}")
+        else:
+            with span('recognize_google'):
+                text = self.main_recognizer.recognize_google(audio, language=language)
+            print(f"You said: {text}")
+        return text
+
+    def _listen_thread(self, language, commands):
         """The target function for the main listening thread."""
         self.is_listening = True
-        with sr.Microphone() as source:
-            try:
-                self.main_recognizer.adjust_for_ambient_noise(source, duration=1.0)
-                audio = self.main_recognizer.listen(source, timeout=5, phrase_time_limit=8)
-                set_face_state('thinking')
+        # In pipelined mode, recognition starts on the phrase so far at a short
+        # pause; if the speaker does not go on, its result is used as is.
+        speculation = {'future': None}
+        def on_partial(partial_audio):
+            speculation['future'] = (self.recognition_pool.submit(self._recognize, partial_audio, language, commands)
+                                     if partial_audio is not None else None)
+        start_turn()
+        try:
+            with span('listen'):
+                audio = self.audio_stream.listen(timeout=5, phrase_time_limit=8,
+                                                 pause_threshold=self.main_pause_threshold,
+                                                 partial_pause=self.partial_pause_threshold,
+                                                 on_partial=on_partial if self.pipelined else None)
+            if audio is None:
+                raise RuntimeError("microphone stream is not running")
+            mark('speech_end')
+            set_face_state('thinking')
+            if self.pipelined:
+                threading.Thread(target=play_sound, args=(PROCESS_SOUND,), daemon=True).start()
+            else:
                 play_sound(PROCESS_SOUND)
-                text = self.main_recognizer.recognize_google(audio, language=language)
+            if speculation['future'] is not None:
+                with span('wait_speculative_recognition'):
+                    text = speculation['future'].result()
+            else:
+                text = self._recognize(audio, language, commands)
+            mark('recognized')
+        except Exception as e:
+            print(f"Listen error: {e}")
+            text = ""
+        finally:
+            self.is_listening = False
+            if self.event_bus:
+                self.event_bus.post('transcribed', text=text)
+            else:
                 self.text_queue.put(text)
-                print(f"You said: {text}")
-            except Exception as e:
-                print(f"Listen error: {e}")
-                self.text_queue.put("")
-            finally:
-                self.is_listening = False
 
-    def start_listening(self, language="bn-BD"):
-        """Starts the main listening process."""
+    def start_listening(self, language="bn-BD", commands=None):
+        """
+        Starts the main listening process.
+
+        Args:
+            language (str): Language code for recognition, e.g. "bn-BD".
+            commands (list): Fixed phrases to try to recognize offline first.
+        """
         if self.is_listening:
             return
         set_face_state('listening')
         play_sound(LISTEN_SOUND)
         while not self.text_queue.empty():
             self.text_queue.get()
-        thread = threading.Thread(target=self._listen_thread, args=(language,), daemon=True)
+        thread = threading.Thread(target=self._listen_thread, args=(language, commands), daemon=True)
         thread.start()
 
     def get_transcribed_text(self):
@@ -72,45 +143,74 @@ class SpeechListener:
         A continuous loop running in a thread, listening only for stop words.
         """
         print("[Interrupt Loop] Started.")
-        with sr.Microphone() as source:
-            self.interrupt_recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            while not self.stop_interrupt_thread.is_set():
-                try:
-                    # Listen for a short phrase
-                    audio = self.interrupt_recognizer.listen(source, timeout=1, phrase_time_limit=2)
-                    text = self.interrupt_recognizer.recognize_google(audio, language=language)
-                    print(f"[Interrupt Listener] Heard: {text}")
-                    if any(word in text.lower() for word in stop_words):
-                        print("[Interrupt Listener] Stop word detected!")
-                        self.interrupt_event.set()
-                        break # Exit loop once detected
-                except sr.UnknownValueError:
-                    # This is expected, just means no one spoke. Loop continues.
+        while not self.stop_interrupt_thread.is_set():
+            try:
+                # Listen for a short phrase; returns None once the listener is stopped.
+                audio = self.audio_stream.listen(phrase_time_limit=2, pause_threshold=self.interrupt_pause_threshold,
+                                                 stop_event=self.stop_interrupt_thread)
+                if audio is None:
+                    if not self.audio_stream.is_running():
+                        time.sleep(1)
                     continue
-                except Exception as e:
-                    # Avoid spamming errors if microphone has issues
-                    time.sleep(1)
+                with span('interrupt_recognize_google'):
+                    text = self.interrupt_recognizer.recognize_google(audio, language=language)
+                print(f"[Interrupt Listener] Heard: {text}")
+                if any(word in text.lower() for word in stop_words):
+                    self._on_stop_word(text)
+                    break # Exit loop once detected
+            except sr.UnknownValueError:
+                # This is expected, just means no one spoke. Loop continues.
+                continue
+            except Exception as e:
+                # Avoid spamming errors if microphone has issues
+                time.sleep(1)
         print("[Interrupt Loop] Stopped.")
 
+    def _on_stop_word(self, text):
+        with self.stop_word_lock:
+            if self.interrupt_event.is_set():
+                return
+            self.interrupt_event.set()
+        print("[Interrupt Listener] Stop word detected!")
+        if self.event_bus:
+            self.event_bus.post('interrupt', text=text)
+
     def start_interrupt_listener(self, language, stop_words):
-        """Starts the continuous interrupt listening thread."""
+        """
+        Starts listening for stop words in the background. Stop words with
+        recorded examples are spotted offline, which needs no network and
+        reacts faster. If any stop word has no examples, phrases are also
+        sent to cloud recognition to listen for those.
+        """
         if self.interrupt_thread and self.interrupt_thread.is_alive():
             return # Listener is already running
         
         self.interrupt_event.clear()
         self.stop_interrupt_thread.clear()
+
+        lang = language.split('-')[0]
+        if self.keyword_spotter.has_keywords(lang, stop_words):
+            self.keyword_spotter.start(self.audio_stream, lang, stop_words, self._on_stop_word)
+        cloud_words = self.keyword_spotter.missing_keywords(lang, stop_words)
+        if not cloud_words:
+            return
         
         self.interrupt_thread = threading.Thread(
             target=self._interrupt_loop,
-            args=(language, stop_words),
+            args=(language, cloud_words),
             daemon=True
         )
         self.interrupt_thread.start()
 
     def stop_interrupt_listener(self):
         """Signals the interrupt listening thread to stop."""
+        self.keyword_spotter.stop()
         if self.interrupt_thread and self.interrupt_thread.is_alive():
             self.stop_interrupt_thread.set()
             self.interrupt_thread.join(timeout=1.5) # Wait for thread to exit
         self.interrupt_event.clear()
 
+    def close(self):
+        """Stops the interrupt listener and closes the microphone stream."""
+        self.stop_interrupt_listener()
+        self.audio_stream.stop()
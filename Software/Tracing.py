@@ -0,0 +1,181 @@
+"""
+Lightweight latency tracing for the interaction pipeline.
+
+A turn starts when the robot starts listening. Within it, `mark(stage)`
+records when a stage was first reached and `span(name)` times a piece of
+work (recognition, the AI request, translation, synthesis). Latencies are
+measured from the 'speech_end' mark, when the user stopped speaking. When
+the turn ends its record is appended to a JSONL file and folded into
+running p50/p95 statistics; turns in which nobody spoke are dropped.
+Summarize a trace file from the project root with:
+
+    python -m Software.Tracing traces/turns.jsonl
+"""
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_turn = None
+_trace_file = os.path.join('traces', 'turns.jsonl')
+# Recent values per mark or span name, for the running percentiles.
+_history = defaultdict(lambda: deque(maxlen=200))
+_turn_count = 0
+
+def set_trace_file(path):
+    """Sets the JSONL file turn records are appended to; None stops writing them."""
+    global _trace_file
+    _trace_file = path
+
+def start_turn():
+    """Starts timing a new turn, closing any turn that is still open."""
+    global _turn
+    end_turn()
+    with _lock:
+        _turn = {'wall_time': time.time(), 'start': time.monotonic(), 'stages': {}, 'spans': []}
+
+def mark(stage):
+    """Records when `stage` was first reached in the current turn. Safe to call from any thread."""
+    with _lock:
+        if _turn is not None and stage not in _turn['stages']:
+            _turn['stages'][stage] = time.monotonic() - _turn['start']
+
+class Span:
+    """A timed piece of work. Use span() for a block, or call end() for work spread over a generator."""
+    def __init__(self, name, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.start = time.monotonic()
+        self.ended = False
+
+    def end(self, **attributes):
+        if self.ended:
+            return
+        self.ended = True
+        self.attributes.update(attributes)
+        _record(self.name, self.start, time.monotonic() - self.start, self.attributes)
+
+def _record(name, start, duration, attributes):
+    with _lock:
+        _history['span:' + name].append(duration)
+        if _turn is not None:
+            _turn['spans'].append({
+                'name': name,
+                'start_s': round(start - _turn['start'], 4),
+                'duration_s': round(duration, 4),
+                **attributes,
+            })
+
+def record_span(name, duration, **attributes):
+    """Records a span measured by the caller, e.g. time summed over several waits, ending now."""
+    _record(name, time.monotonic() - duration, duration, attributes)
+
+@contextmanager
+def span(name, **attributes):
+    """Times the enclosed block; attributes may be added to the yielded Span before it ends."""
+    current = Span(name, **attributes)
+    try:
+        yield current
+    except Exception as e:
+        current.attributes['error'] = type(e).__name__
+        raise
+    finally:
+        current.end()
+
+def end_turn():
+    """Closes the current turn, if one is running: logs it, writes its record and updates the statistics."""
+    global _turn, _turn_count
+    with _lock:
+        turn, _turn = _turn, None
+        if not turn or 'speech_end' not in turn['stages']:
+            return None
+        speech_end = turn['stages']['speech_end']
+        record = {
+            'time': round(turn['wall_time'], 3),
+            'duration_s': round(time.monotonic() - turn['start'], 4),
+            'stages': {stage: round(seconds, 4) for stage, seconds in turn['stages'].items()},
+            # Seconds from the end of the user's speech to each later stage.
+            'latency': {stage: round(seconds - speech_end, 4)
+                        for stage, seconds in turn['stages'].items() if seconds > speech_end},
+            'spans': turn['spans'],
+        }
+        for stage, seconds in record['latency'].items():
+            _history['latency:' + stage].append(seconds)
+        _turn_count += 1
+        path = _trace_file
+
+    stages = sorted(record['latency'].items(), key=lambda item: item[1])
+    print("[Latency] " + " | ".join(f"{stage} +{seconds:.2f}s" for stage, seconds in stages))
+    if path:
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"[Tracing] Could not write the trace file: {e}")
+    return record
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+def _summarize(series):
+    return {
+        name: {
+            'count': len(values),
+            'p50_s': round(percentile(values, 50), 3),
+            'p95_s': round(percentile(values, 95), 3),
+        }
+        for name, values in sorted(series.items()) if values
+    }
+
+def summary():
+    """p50/p95 of every stage latency and span duration seen in this process."""
+    with _lock:
+        series = {name: list(values) for name, values in _history.items()}
+        turns = _turn_count
+    return {'turns': turns, 'metrics': _summarize(series)}
+
+def log_summary():
+    """Prints the running p50/p95 statistics, e.g. at shutdown."""
+    result = summary()
+    if not result['turns']:
+        return
+    print(f"[Latency] p50 / p95 over {result['turns']} turns:")
+    for name, stats in result['metrics'].items():
+        print(f"  {name}: {stats['p50_s']:.2f}s / {stats['p95_s']:.2f}s (n={stats['count']})")
+
+def summarize_file(path):
+    """p50/p95 of every stage latency and span duration in a JSONL trace file."""
+    series = defaultdict(list)
+    turns = 0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            turns += 1
+            for stage, seconds in record.get('latency', {}).items():
+                series['latency:' + stage].append(seconds)
+            for item in record.get('spans', []):
+                series['span:' + item['name']].append(item['duration_s'])
+    return {'turns': turns, 'metrics': _summarize(series)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize per-turn latency traces.")
+    parser.add_argument('file', nargs='?', default=_trace_file, help="JSONL trace file.")
+    args = parser.parse_args()
+    print(json.dumps(summarize_file(args.file), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
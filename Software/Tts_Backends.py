@@ -0,0 +1,129 @@
+import shutil
+import subprocess
+import threading
+import time
+from io import BytesIO
+from gtts import gTTS
+
+class GTTSBackend:
+    """Online synthesis with Google Translate's TTS. Returns MP3 bytes."""
+    name = 'gtts'
+
+    def __init__(self, slow=False):
+        self.slow = slow
+
+    @property
+    def voice(self):
+        """Settings that change how the audio sounds, part of its cache key."""
+        return {'slow': self.slow}
+
+    def synthesize(self, text, lang):
+        tts = gTTS(text=text, lang=lang, slow=self.slow)
+        fp = BytesIO()
+        tts.write_to_fp(fp)
+        return fp.getvalue()
+
+class EspeakBackend:
+    """
+    Offline synthesis with the espeak command-line tool. The speech is
+    rendered to a WAV buffer instead of the sound card, so it goes through
+    the same pygame mixer path as online audio and stays interruptible.
+    """
+    name = 'espeak'
+
+    def __init__(self, executable=None, timeout=30):
+        self.executable = executable or shutil.which('espeak-ng') or shutil.which('espeak') or 'espeak'
+        self.timeout = timeout
+
+    def synthesize(self, text, lang):
+        result = subprocess.run(
+            [self.executable, '-v', lang, '--stdout', text],
+            capture_output=True, timeout=self.timeout, check=True,
+        )
+        if not result.stdout:
+            raise RuntimeError("espeak produced no audio")
+        return result.stdout
+
+class FailoverSynthesizer:
+    """
+    Tries an online backend first and falls back to an offline one. After
+    `failure_threshold` consecutive online failures the offline backend is
+    used first for `cooldown` seconds, so a dead network does not cost
+    retries and timeouts on every utterance.
+    """
+    def __init__(self, online, offline, retries=2, retry_delay=0.3, failure_threshold=2, cooldown=60.0):
+        """
+        Args:
+            online: Preferred backend, e.g. GTTSBackend.
+            offline: Backend used when the online one fails, e.g. EspeakBackend.
+            retries (int): Online attempts per utterance outside the cooldown.
+            retry_delay (float): Seconds between two online attempts.
+            failure_threshold (int): Consecutive failed utterances that start a cooldown.
+            cooldown (float): Seconds the offline backend is preferred after that.
+        """
+        self.online = online
+        self.offline = offline
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.offline_until = 0.0
+
+    def in_cooldown(self):
+        with self.lock:
+            return time.monotonic() < self.offline_until
+
+    def _record(self, success):
+        with self.lock:
+            if success:
+                self.failures = 0
+                self.offline_until = 0.0
+                return
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.offline_until = time.monotonic() + self.cooldown
+                print(f"[TTS] Online TTS keeps failing; using offline speech first for {self.cooldown:.0f}s.")
+
+    def synthesize_online(self, text, lang, retries=None):
+        """Returns online audio bytes, or None if every attempt failed."""
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries):
+            try:
+                audio = self.online.synthesize(text, lang)
+                self._record(True)
+                return audio
+            except Exception as e:
+                print(f"[TTS Warning] {self.online.name} attempt {attempt + 1} failed: {e}")
+                if attempt < retries - 1:
+                    time.sleep(self.retry_delay)
+        self._record(False)
+        return None
+
+    def synthesize_offline(self, text, lang):
+        try:
+            return self.offline.synthesize(text, lang)
+        except Exception as e:
+            print(f"[TTS Warning] {self.offline.name} failed: {e}")
+            return None
+
+    def synthesize(self, text, lang):
+        """
+        Returns (audio bytes, backend that produced them), or (None, None) if
+        every backend failed.
+        """
+        if self.in_cooldown():
+            audio = self.synthesize_offline(text, lang)
+            if audio:
+                return audio, self.offline
+            # Offline failed too: one online attempt is still better than silence.
+            audio = self.synthesize_online(text, lang, retries=1)
+            return (audio, self.online) if audio else (None, None)
+
+        audio = self.synthesize_online(text, lang)
+        if audio:
+            return audio, self.online
+        print(f"[TTS] Falling back to offline '{self.offline.name}' synthesizer.")
+        audio = self.synthesize_offline(text, lang)
+        return (audio, self.offline) if audio else (None, None)
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+
+class TtsCache:
+    """
+    An on-disk LRU cache of synthesized speech. Entries are keyed by the
+    normalized text, the language and any voice settings, and the least
+    recently played entries are evicted once the cache grows past its size
+    limit. It stores whatever audio bytes it is given, so any backend (or
+    an offline stand-in) can fill it.
+    """
+    def __init__(self, cache_dir='tts_cache', max_bytes=50 * 1024 * 1024, extension='.mp3'):
+        """
+        Args:
+            cache_dir (str): Directory the audio files are stored in.
+            max_bytes (int): Total size above which old entries are evicted.
+            extension (str): File extension of the cached audio.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.lock = threading.Lock()
+        self.entries = {}  # key -> (last_used, size)
+        self.total_bytes = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Rebuilds the index from the files left by previous runs."""
+        for file in os.listdir(self.cache_dir):
+            if not file.endswith(self.extension):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, file))
+            self.entries[file[:-len(self.extension)]] = (stat.st_mtime, stat.st_size)
+            self.total_bytes += stat.st_size
+
+    @staticmethod
+    def normalize(text):
+        """Collapses whitespace and Unicode variants so equivalent strings share an entry."""
+        return " ".join(unicodedata.normalize('NFC', text).split())
+
+    def make_key(self, text, lang, **voice):
+        payload = json.dumps([self.normalize(text), lang, voice], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.extension)
+
+    def contains(self, text, lang, **voice):
+        with self.lock:
+            return self.make_key(text, lang, **voice) in self.entries
+
+    def get(self, text, lang, **voice):
+        """Returns the cached audio bytes, or None on a miss."""
+        key = self.make_key(text, lang, **voice)
+        with self.lock:
+            if key not in self.entries:
+                return None
+            try:
+                with open(self._path(key), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                self._forget(key)
+                return None
+            # Touch the file so the LRU order survives restarts.
+            now = _touch(self._path(key))
+            self.entries[key] = (now, len(data))
+        return data
+
+    def put(self, text, lang, data, **voice):
+        """Stores audio bytes and evicts the least recently used entries if needed."""
+        if not data:
+            return
+        key = self.make_key(text, lang, **voice)
+        path = self._path(key)
+        tmp_path = path + '.tmp'
+        with self.lock:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._forget(key, delete=False)
+            self.entries[key] = (_touch(path), len(data))
+            self.total_bytes += len(data)
+            self._evict()
+
+    def _forget(self, key, delete=True):
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.total_bytes -= entry[1]
+        if delete:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self.entries.items(), key=lambda item: item[1][0]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._forget(key)
+
+def _touch(path):
+    """Updates a file's modification time and returns it."""
+    os.utime(path)
+    return os.stat(path).st_mtime
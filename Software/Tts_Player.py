@@ -1,67 +1,267 @@
 import pygame
-from gtts import gTTS
 from io import BytesIO
-import os
 from .Servo import send_to_arduino
 import time
+import threading
+from queue import Queue
 # Import is now at the top level for better practice and to avoid circular dependencies.
 from .Face_Display import set_face_state
+from .Tts_Cache import TtsCache
+from .Tts_Backends import FailoverSynthesizer, GTTSBackend, EspeakBackend
+from .Units import split_sentences
+from .Tracing import mark, span
 
-pygame.mixer.init()
-pygame.mixer.music.set_volume(1.0)
+_mixer_init_lock = threading.Lock()
 
-def play_tts(text, lang='en'):
+def _music():
     """
-    Generates and plays TTS audio. Sets face state to 'talking' immediately.
+    pygame's music player. The mixer is initialized on first use rather
+    than at import, so processes that only import this module (e.g.
+    training workers) do not open the sound device.
     """
+    with _mixer_init_lock:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+            pygame.mixer.music.set_volume(1.0)
+    return pygame.mixer.music
+
+def _mixer_busy():
+    """True while music plays; False if the mixer was never started."""
+    return bool(pygame.mixer.get_init()) and pygame.mixer.music.get_busy()
+
+# Synthesized phrases are kept on disk so repeated ones play without a network round trip.
+tts_cache = TtsCache()
+
+# Online gTTS with an offline espeak fallback. Any backend with a `name` and a
+# `synthesize(text, lang)` method returning audio bytes can be plugged in
+# through set_synthesizer(), e.g. a local stand-in for tests.
+synthesizer = FailoverSynthesizer(GTTSBackend(), EspeakBackend())
+
+def set_synthesizer(new_synthesizer):
+    """Replaces the speech synthesizer, e.g. with a FailoverSynthesizer of other backends."""
+    global synthesizer
+    synthesizer = new_synthesizer
+
+def _voice(backend):
+    """The cache key settings of a backend: its name and any voice settings it exposes."""
+    return {'engine': backend.name, **getattr(backend, 'voice', {})}
+
+def _synthesize(text, lang):
+    """
+    Returns audio bytes for the text from the cache or the synthesizer, or
+    None if every backend failed. Only online audio is cached: offline
+    speech is cheap to redo and should not replace the better voice later.
+    """
+    with span('tts_cache_lookup'):
+        audio = tts_cache.get(text, lang, **_voice(synthesizer.online))
+    if audio is not None:
+        print("[TTS] Playing audio from cache.")
+        return audio
+    with span('synthesize', chars=len(text)) as current:
+        audio, backend = synthesizer.synthesize(text, lang)
+        current.attributes['backend'] = backend.name if backend else None
+    if audio and backend is synthesizer.online:
+        print("[TTS] Successfully generated audio online.")
+        tts_cache.put(text, lang, audio, **_voice(backend))
+    return audio
+
+# Callbacks run (from a background thread) whenever playback finishes.
+_finished_listeners = []
+
+def add_finished_listener(callback):
+    """Registers `callback()` to be called each time speech playback ends or is stopped."""
+    _finished_listeners.append(callback)
+
+def _notify_finished():
+    mark('playback_end')
+    for callback in _finished_listeners:
+        callback()
+
+def _watch_playback():
+    """Waits in the background for the mixer to go idle, then notifies the listeners."""
+    time.sleep(0.1)
+    while _mixer_busy():
+        time.sleep(0.05)
+    _notify_finished()
+
+# Marks the end of a streamed response in the playback queue.
+_END = object()
+
+class _SpeechStream:
+    """
+    Plays a multi-sentence response sentence by sentence. A synthesis thread
+    works ahead of playback, so the first sentence starts as soon as it is
+    ready and later ones are usually synthesized before they are needed.
+    """
+    def __init__(self, sentences, lang):
+        self.sentences = sentences
+        self.lang = lang
+        self.ready = Queue()
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        threading.Thread(target=self._synthesis_loop, daemon=True).start()
+        threading.Thread(target=self._playback_loop, daemon=True).start()
+
+    def _synthesis_loop(self):
+        try:
+            # `sentences` may be a generator still waiting for the AI's answer.
+            for sentence in self.sentences:
+                if self.cancelled.is_set():
+                    break
+                if sentence:
+                    self.ready.put(_synthesize(sentence, self.lang))
+                    mark('first_audio_ready')
+        except Exception as e:
+            print(f"[TTS Error] The response stream failed: {e}")
+        finally:
+            self.ready.put(_END)
+
+    def _wait_for_mixer(self):
+        while _mixer_busy() and not self.cancelled.is_set():
+            time.sleep(0.01)
+
+    def _playback_loop(self):
+        started = False
+        try:
+            while not self.cancelled.is_set():
+                item = self.ready.get()
+                if item is _END:
+                    break
+                if not item:
+                    print("[TTS Error] No speech backend could synthesize a sentence. Skipping it.")
+                    continue
+                self._wait_for_mixer()
+                # Checked under the lock so nothing starts after cancel() returned.
+                with _mixer_lock:
+                    if self.cancelled.is_set():
+                        break
+                    if not started:
+                        # The face keeps thinking while the AI is still working on the first sentence.
+                        started = True
+                        set_face_state('talking')
+                        send_to_arduino("talk")
+                    _music().load(BytesIO(item))
+                    _music().play()
+                mark('playback_start')
+                # Give the mixer a moment to report busy before polling it again.
+                time.sleep(0.05)
+            self._wait_for_mixer()
+        except Exception as e:
+            print(f"TTS Playback Error: {e}")
+        finally:
+            send_to_arduino("rest")
+            self.finished.set()
+            _notify_finished()
+
+    def cancel(self):
+        with _mixer_lock:
+            self.cancelled.set()
+
+    def is_active(self):
+        return not self.finished.is_set()
+
+# The response currently being streamed, if any.
+_active_stream = None
+_mixer_lock = threading.Lock()
+
+def _cancel_stream():
+    global _active_stream
+    if _active_stream:
+        _active_stream.cancel()
+        _active_stream = None
+
+def play_tts(text, lang='en', stream=False):
+    """
+    Generates and plays TTS audio. Sets face state to 'talking' immediately,
+    or for an iterable of sentences once the first one starts playing.
+
+    With stream=True, a multi-sentence text is synthesized and played one
+    sentence at a time, so speech starts after the first sentence instead
+    of after the whole text has been synthesized. `text` may then also be
+    an iterable of sentences, e.g. from generate_response_stream(), which
+    is consumed while earlier sentences play.
+    """
+    global _active_stream
+    if stream and not isinstance(text, str):
+        _cancel_stream()
+        _music().stop()
+        _active_stream = _SpeechStream(text, lang)
+        return
     if not text:
         print("TTS Error: Received empty text.")
+        # Nothing will play, but whoever waits for the end of speech must still hear about it.
+        _notify_finished()
         return
 
     # Set the face to 'talking' as soon as we decide to speak.
     set_face_state('talking')
+    _cancel_stream()
 
-    fp = None
-    retries = 3
-    for attempt in range(retries):
-        try:
-            tts = gTTS(text=text, lang=lang, slow=False)
-            fp = BytesIO()
-            tts.write_to_fp(fp)
-            fp.seek(0)
-            print("[TTS] Successfully generated audio online.")
-            break
-        except Exception as e:
-            print(f"[TTS Warning] Attempt {attempt + 1} failed: {e}")
-            if attempt < retries - 1:
-                time.sleep(0.5)
-            else:
-                print("[TTS Error] Online TTS failed after multiple retries.")
-                fp = None
+    if stream:
+        sentences = split_sentences(text)
+        if len(sentences) > 1:
+            _music().stop()
+            _active_stream = _SpeechStream(sentences, lang)
+            return
+
+    audio = _synthesize(text, lang)
+    mark('first_audio_ready')
 
     try:
-        if fp:
-            pygame.mixer.music.stop()
+        if audio:
+            _music().stop()
             send_to_arduino("talk")
-            pygame.mixer.music.load(fp)
-            pygame.mixer.music.play()
+            _music().load(BytesIO(audio))
+            _music().play()
+            mark('playback_start')
+            threading.Thread(target=_watch_playback, daemon=True).start()
             time.sleep(0.1)
         else:
-            print("[TTS] Falling back to offline 'espeak' synthesizer.")
-            os.system(f'espeak -v {lang} "{text}"')
+            print("[TTS Error] No speech backend could synthesize the text.")
             send_to_arduino("rest")
+            _notify_finished()
             
     except Exception as e:
         print(f"TTS Playback Error: {e}")
         send_to_arduino("rest")
+        _notify_finished()
+
+def prewarm_tts(phrases):
+    """
+    Synthesizes (text, lang) pairs into the TTS cache in a background thread,
+    so they play instantly later and still play when gTTS is unreachable.
+    """
+    def _prewarm():
+        started = time.time()
+        synthesized = 0
+        voice = _voice(synthesizer.online)
+        for text, lang in phrases:
+            if tts_cache.contains(text, lang, **voice):
+                continue
+            audio = None if synthesizer.in_cooldown() else synthesizer.synthesize_online(text, lang)
+            if audio is None:
+                print("[TTS] Prewarm stopped: online TTS is unavailable.")
+                return
+            tts_cache.put(text, lang, audio, **voice)
+            synthesized += 1
+        print(f"[TTS] Prewarmed {synthesized} phrases in {time.time() - started:.1f}s.")
+
+    thread = threading.Thread(target=_prewarm, daemon=True)
+    thread.start()
+    return thread
 
 def stop_tts():
-    pygame.mixer.music.stop()
+    _cancel_stream()
+    if pygame.mixer.get_init():
+        pygame.mixer.music.stop()
     send_to_arduino("rest")
     set_face_state('idle')
 
 def is_playing():
-    return pygame.mixer.music.get_busy()
+    """True while audio plays or a streamed response still has sentences to come."""
+    if _active_stream and _active_stream.is_active():
+        return True
+    return _mixer_busy()
 
 def wait_until_finished():
     """
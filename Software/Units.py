@@ -1,7 +1,11 @@
 import pygame
+import threading
 import time
 import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from .Servo import send_to_arduino
+from .Tracing import span
 
 def play_sound(file_path):
     try:
@@ -31,13 +35,105 @@ def clean_response(text):
     # Strip leading/trailing whitespace
     return text.strip()
 
-def translate_text(text, dest='bn'):
+def split_sentences(text):
+    """
+    Splits text into sentences on '.', '!', '?' and the Bangla danda '।',
+    keeping the punctuation. Very short fragments are merged into the
+    previous sentence so each piece is worth a synthesis request.
+    """
+    if not text:
+        return []
+    parts = [p.strip() for p in re.split(r'(?<=[.!?।])\s+', text.strip()) if p.strip()]
+    sentences = []
+    for part in parts:
+        if sentences and len(part) < 12:
+            sentences[-1] += " " + part
+        else:
+            sentences.append(part)
+    return sentences
+
+# One translation client per target language and thread, created on first use.
+_translator_local = threading.local()
+# Which translation library is installed: resolved once instead of on every call.
+_translator_library = None
+_translation_cache = OrderedDict()  # (text, dest) -> translation
+_translation_cache_lock = threading.Lock()
+TRANSLATION_CACHE_SIZE = 512
+_translation_pool = ThreadPoolExecutor(max_workers=4)
+
+def _resolve_translator_library():
+    global _translator_library
+    if _translator_library is None:
+        try:
+            import deep_translator  # noqa: F401
+            _translator_library = 'deep_translator'
+        except ImportError:
+            try:
+                import googletrans  # noqa: F401
+                _translator_library = 'googletrans'
+            except ImportError:
+                print("Translation error: neither deep_translator nor googletrans is installed.")
+                _translator_library = ''
+    return _translator_library
+
+def _translator(dest):
+    """Returns this thread's reusable client for `dest`, or None if no library is installed."""
+    clients = getattr(_translator_local, 'clients', None)
+    if clients is None:
+        clients = _translator_local.clients = {}
+    if dest not in clients:
+        library = _resolve_translator_library()
+        if library == 'deep_translator':
+            from deep_translator import GoogleTranslator
+            client = GoogleTranslator(source='auto', target=dest)
+            clients[dest] = client.translate
+        elif library == 'googletrans':
+            from googletrans import Translator
+            client = Translator()
+            clients[dest] = lambda text: client.translate(text, dest=dest).text
+        else:
+            clients[dest] = None
+    return clients[dest]
+
+def _translate_segment(text, dest):
+    """Translates one segment through the LRU cache. Falls back to the original text on errors."""
+    key = (text, dest)
+    with _translation_cache_lock:
+        if key in _translation_cache:
+            _translation_cache.move_to_end(key)
+            return _translation_cache[key]
+    translate = _translator(dest)
+    if translate is None:
+        return text
     try:
-        from deep_translator import GoogleTranslator
-        return GoogleTranslator(source='auto', target=dest).translate(text)
-    except ImportError:
-        from googletrans import Translator
-        return Translator().translate(text, dest=dest).text
+        with span('translate', chars=len(text)):
+            result = translate(text)
     except Exception as e:
         print(f"Translation error: {e}")
         return text
+    if not result:
+        return text
+    with _translation_cache_lock:
+        _translation_cache[key] = result
+        while len(_translation_cache) > TRANSLATION_CACHE_SIZE:
+            _translation_cache.popitem(last=False)
+    return result
+
+def translate_segments(segments, dest='bn'):
+    """
+    Translates all segments concurrently and yields the translations in
+    order, each as soon as it and the ones before it are done, so speech
+    can start on the first one.
+    """
+    futures = [_translation_pool.submit(_translate_segment, segment, dest) for segment in segments if segment]
+    for future in futures:
+        yield future.result()
+
+def translate_text(text, dest='bn'):
+    """Translates text, cached and sentence by sentence in parallel for longer texts."""
+    if not text:
+        return text
+    sentences = split_sentences(text)
+    if len(sentences) <= 1:
+        return _translate_segment(text, dest)
+    return " ".join(translate_segments(sentences, dest))
@@ -0,0 +1,111 @@
+import numpy as np
+
+def zero_crossing_rate(data):
+    """Fraction of neighbouring 16-bit samples that change sign."""
+    samples = np.frombuffer(data, dtype=np.int16)
+    if len(samples) < 2:
+        return 0.0
+    return float(np.count_nonzero(np.diff(np.signbit(samples)))) / (len(samples) - 1)
+
+class VoiceActivityDetector:
+    """
+    Decides locally whether audio is likely to be speech, so only those
+    segments are sent to cloud recognition. A chunk counts as speech when
+    its energy is above the stream's noise threshold and its zero-crossing
+    rate lies in the range of the human voice: hum and rumble cross zero
+    too rarely, hiss and clicks too often. A finished segment is only
+    accepted if it holds enough speech chunks to be a word.
+
+    While the robot itself is talking (`echo_check` returns True), the
+    energy threshold is raised by `echo_ratio`, so its own voice from the
+    speaker is not taken for the user's.
+    """
+    def __init__(self, min_zcr=0.01, max_zcr=0.35, min_speech_seconds=0.25, echo_check=None, echo_ratio=3.0):
+        """
+        Args:
+            min_zcr (float): Lowest zero-crossing rate counted as speech.
+            max_zcr (float): Highest zero-crossing rate counted as speech.
+            min_speech_seconds (float): Speech a segment needs to be passed on.
+            echo_check (callable): Returns True while the robot is playing audio.
+            echo_ratio (float): Threshold multiplier while `echo_check()` is True.
+        """
+        self.min_zcr = min_zcr
+        self.max_zcr = max_zcr
+        self.min_speech_seconds = min_speech_seconds
+        self.echo_check = echo_check
+        self.echo_ratio = echo_ratio
+        self.accepted_count = 0   # Segments passed on to recognition
+        self.rejected_count = 0   # Segments dropped as noise
+
+    def is_speech(self, data, energy, threshold):
+        if threshold is None:
+            return False
+        if self.echo_check is not None and self.echo_check():
+            threshold *= self.echo_ratio
+        if energy <= threshold:
+            return False
+        return self.min_zcr <= zero_crossing_rate(data) <= self.max_zcr
+
+    def accept(self, speech_seconds):
+        """Counts and returns whether a segment with this much speech is worth recognizing."""
+        accepted = speech_seconds >= self.min_speech_seconds
+        if accepted:
+            self.accepted_count += 1
+        else:
+            self.rejected_count += 1
+        return accepted
+
+class PhraseSegmenter:
+    """
+    Cuts a chunk stream into phrases: a phrase starts at the first speech
+    chunk (plus a little audio from before it) and ends after
+    `pause_threshold` seconds of non-speech or at `phrase_time_limit`.
+    Phrases the detector does not accept are dropped.
+    """
+    def __init__(self, vad, chunk_seconds, pause_threshold=0.8, phrase_time_limit=None, pre_roll=0.3):
+        self.vad = vad
+        self.chunk_seconds = chunk_seconds
+        self.pause_chunks = max(1, int(pause_threshold / chunk_seconds))
+        self.limit_chunks = None if phrase_time_limit is None else int(phrase_time_limit / chunk_seconds)
+        self.pre_roll_chunks = max(1, int(pre_roll / chunk_seconds))
+        self.reset()
+
+    def reset(self):
+        self.before = []
+        self.frames = []
+        self.silent = 0
+        self.speech_chunks = 0
+
+    @property
+    def in_phrase(self):
+        return bool(self.frames)
+
+    def feed(self, data, energy, threshold):
+        """
+        Adds one chunk.
+
+        Returns:
+            bytes: The audio of a finished, accepted phrase, or None.
+        """
+        is_speech = self.vad.is_speech(data, energy, threshold)
+        if not self.frames:
+            if not is_speech:
+                self.before = (self.before + [data])[-self.pre_roll_chunks:]
+                return None
+            self.frames = self.before
+            self.before = []
+
+        self.frames.append(data)
+        if is_speech:
+            self.silent = 0
+            self.speech_chunks += 1
+        else:
+            self.silent += 1
+        if self.silent < self.pause_chunks and (self.limit_chunks is None or len(self.frames) < self.limit_chunks):
+            return None
+
+        frames, speech_seconds = self.frames, self.speech_chunks * self.chunk_seconds
+        self.reset()
+        if not self.vad.accept(speech_seconds):
+            return None
+        return b"".join(frames)
@@ -0,0 +1,238 @@
+"""
+Benchmarks the face pipeline without a camera.
+
+Measures training on the known_faces dataset, hold-out accuracy on its
+images, and per-stage timings, FPS and time-to-recognition on recorded
+videos. Run it from the project root:
+
+    python -m Software.benchmark_faces
+    python -m Software.benchmark_faces --video clips/goutom.avi:goutom-roy --json bench.json
+"""
+import argparse
+import cv2
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from collections import Counter, deque
+from .Face_Recognition import FaceRecognizer
+from .Camera_Stream import VideoFileStream
+
+class StageTimer:
+    """Accumulates wall-clock time per pipeline stage."""
+    def __init__(self):
+        self.totals = {}
+        self.counts = {}
+
+    def add(self, stage, seconds):
+        self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def summary(self):
+        return {
+            stage: {
+                'calls': self.counts[stage],
+                'total_ms': round(total * 1000, 2),
+                'mean_ms': round(total * 1000 / self.counts[stage], 3),
+            }
+            for stage, total in self.totals.items()
+        }
+
+def bench_training(dataset_path, workers):
+    """Times a cold train (empty cache) and a warm retrain (cached crops)."""
+    trainer_path = tempfile.mkdtemp(prefix='assistai_bench_')
+    try:
+        recognizer = FaceRecognizer(dataset_path, trainer_path, workers=workers)
+        start = time.perf_counter()
+        ok = recognizer.train()
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        recognizer.train(force=True)
+        warm = time.perf_counter() - start
+        return {'ok': ok, 'cold_s': round(cold, 3), 'warm_cached_s': round(warm, 3)}
+    finally:
+        shutil.rmtree(trainer_path, ignore_errors=True)
+
+def bench_images(dataset_path, scale_factor, min_neighbors, confidence_threshold, holdout_every):
+    """
+    Trains on most of each person's images and predicts the held-out rest,
+    timing decode, detect and predict separately.
+    """
+    timer = StageTimer()
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    train_faces, train_ids, test_faces, test_ids = [], [], [], []
+    label_ids = {}
+
+    people = sorted(d for d in os.listdir(dataset_path) if os.path.isdir(os.path.join(dataset_path, d)))
+    for person in people:
+        label_ids[person] = len(label_ids)
+        folder = os.path.join(dataset_path, person)
+        files = sorted(f for f in os.listdir(folder) if f.endswith(("png", "jpg", "jpeg")))
+        for index, file in enumerate(files):
+            start = time.perf_counter()
+            image = cv2.imread(os.path.join(folder, file), cv2.IMREAD_GRAYSCALE)
+            timer.add('decode', time.perf_counter() - start)
+            if image is None:
+                continue
+
+            start = time.perf_counter()
+            detected = cascade.detectMultiScale(image, scaleFactor=scale_factor, minNeighbors=min_neighbors)
+            timer.add('detect', time.perf_counter() - start)
+
+            held_out = index % holdout_every == 0
+            for (x, y, w, h) in detected:
+                (test_faces if held_out else train_faces).append(image[y:y+h, x:x+w])
+                (test_ids if held_out else train_ids).append(label_ids[person])
+
+    if not train_faces or not test_faces:
+        return {'error': 'Not enough faces detected for a hold-out evaluation.'}
+
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    start = time.perf_counter()
+    recognizer.train(train_faces, np.array(train_ids))
+    timer.add('train', time.perf_counter() - start)
+
+    correct = rejected = 0
+    for roi, expected in zip(test_faces, test_ids):
+        start = time.perf_counter()
+        id_, confidence = recognizer.predict(roi)
+        timer.add('predict', time.perf_counter() - start)
+        if confidence >= confidence_threshold:
+            rejected += 1
+        elif id_ == expected:
+            correct += 1
+
+    return {
+        'people': len(people),
+        'train_faces': len(train_faces),
+        'test_faces': len(test_faces),
+        'accuracy': round(correct / len(test_faces), 4),
+        'rejected': round(rejected / len(test_faces), 4),
+        'stages': timer.summary(),
+    }
+
+def bench_video(recognizer, path, expected, fast_detection, tracker_options,
+                confidence_threshold, required_recognitions, vote_window):
+    """
+    Replays a recorded video through detection and prediction and reports
+    stage timings, processing FPS, accuracy and time-to-recognition using the
+    same sliding-window vote as FaceRecognizer.recognize_face().
+    """
+    stream = VideoFileStream(path)
+    if not stream.start():
+        return {'error': f"Cannot open '{path}'"}
+
+    timer = StageTimer()
+    tracker = recognizer.create_tracker(**tracker_options) if fast_detection else None
+    predictions = correct = 0
+    votes = deque(maxlen=max(vote_window, required_recognitions))
+    recognized = None
+    started = time.perf_counter()
+
+    while True:
+        start = time.perf_counter()
+        frame = stream.get_latest_frame()
+        timer.add('decode', time.perf_counter() - start)
+        if frame is None:
+            break
+
+        start = time.perf_counter()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if tracker:
+            faces = tracker.detect(gray)
+        else:
+            faces = recognizer.face_cascade.detectMultiScale(
+                gray, scaleFactor=tracker_options['scale_factor'],
+                minNeighbors=tracker_options['min_neighbors'])
+        timer.add('detect', time.perf_counter() - start)
+
+        start = time.perf_counter()
+        rois = [gray[y:y+h, x:x+w] for (x, y, w, h) in faces]
+        results = recognizer.predict_batch(rois, k=1)
+        if rois:
+            timer.add('predict', time.perf_counter() - start)
+
+        for candidates in results:
+            id_, confidence = candidates[0]
+            predictions += 1
+            name = recognizer.labels.get(id_) if confidence < confidence_threshold else None
+            if expected and name == expected:
+                correct += 1
+            votes.append(id_ if name else None)
+
+        ranked = Counter(v for v in votes if v is not None).most_common(1)
+        if recognized is None and ranked and ranked[0][1] >= required_recognitions:
+            recognized = {
+                'name': recognizer.labels.get(ranked[0][0]),
+                'video_time_s': round(stream.position(), 3),
+                'processing_time_s': round(time.perf_counter() - started, 3),
+            }
+
+    elapsed = time.perf_counter() - started
+    frames = stream.frame_count
+    stream.stop()
+    result = {
+        'frames': frames,
+        'fps': round(frames / elapsed, 2) if elapsed else 0.0,
+        'predictions': predictions,
+        'recognized': recognized,
+        'stages': timer.summary(),
+    }
+    if expected:
+        result['expected'] = expected
+        result['accuracy'] = round(correct / predictions, 4) if predictions else 0.0
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AssistAI face training and recognition.")
+    parser.add_argument('--dataset', default='known_faces', help="Directory with one folder of images per person.")
+    parser.add_argument('--trainer', default='trainer', help="Directory holding the trained model used for videos.")
+    parser.add_argument('--video', action='append', default=[],
+                        help="Recorded video to replay, optionally as PATH:expected-label. Repeatable.")
+    parser.add_argument('--scale-factor', type=float, default=1.2)
+    parser.add_argument('--min-neighbors', type=int, default=5)
+    parser.add_argument('--confidence-threshold', type=float, default=75)
+    parser.add_argument('--required-recognitions', type=int, default=5)
+    parser.add_argument('--vote-window', type=int, default=7)
+    parser.add_argument('--holdout-every', type=int, default=5, help="Hold out every Nth image per person.")
+    parser.add_argument('--workers', type=int, default=None, help="Training worker processes.")
+    parser.add_argument('--no-fast-detection', action='store_true', help="Scan every full frame instead of tracking.")
+    parser.add_argument('--skip-training', action='store_true')
+    parser.add_argument('--json', help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    results = {}
+    if not args.skip_training:
+        print("[BENCH] Training...")
+        results['training'] = bench_training(args.dataset, args.workers)
+        print("[BENCH] Hold-out accuracy on dataset images...")
+        results['images'] = bench_images(args.dataset, args.scale_factor, args.min_neighbors,
+                                         args.confidence_threshold, args.holdout_every)
+
+    if args.video:
+        recognizer = FaceRecognizer(args.dataset, args.trainer)
+        if not recognizer.load_trained_model() and not (recognizer.train() and recognizer.load_trained_model()):
+            print("[BENCH] No model available for the video benchmark.")
+            return
+        tracker_options = {'scale_factor': args.scale_factor, 'min_neighbors': args.min_neighbors}
+        results['videos'] = {}
+        for spec in args.video:
+            path, expected = spec, None
+            if not os.path.exists(spec) and ':' in spec:
+                path, _, expected = spec.rpartition(':')
+            print(f"[BENCH] Replaying {path}...")
+            results['videos'][path] = bench_video(recognizer, path, expected,
+                                                  not args.no_fast_detection, tracker_options,
+                                                  args.confidence_threshold, args.required_recognitions,
+                                                  args.vote_window)
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
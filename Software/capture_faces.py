@@ -1,36 +1,120 @@
+"""
+Enrolls a person for face recognition.
+
+Captures face crops from the camera into known_faces/<name>/, keeping only
+sharp frames that differ from what was already saved, then updates the
+trained model. Run it from the project root:
+
+    python -m Software.capture_faces "Your Name"
+"""
+import argparse
 import cv2
 import os
+import numpy as np
+from .Camera_Stream import CameraStream
+from .Face_Recognition import FaceRecognizer
+
+def blur_score(gray):
+    """Variance of the Laplacian: low values mean a blurry image."""
+    return cv2.Laplacian(gray, cv2.CV_64F).var()
+
+def dhash(gray, hash_size=8):
+    """64-bit difference hash; near-identical images differ in only a few bits."""
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+def existing_images(save_dir):
+    """Returns (hashes of the images already enrolled, the next free file number)."""
+    hashes = []
+    next_index = 1
+    for file in os.listdir(save_dir):
+        name, ext = os.path.splitext(file)
+        if ext.lower() not in ('.png', '.jpg', '.jpeg'):
+            continue
+        image = cv2.imread(os.path.join(save_dir, file), cv2.IMREAD_GRAYSCALE)
+        if image is not None:
+            hashes.append(dhash(image))
+        if name.isdigit():
+            next_index = max(next_index, int(name) + 1)
+    return hashes, next_index
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture face images of one person and update the model.")
+    parser.add_argument('name', help="The person's name; images go to known_faces/<name>/.")
+    parser.add_argument('--count', type=int, default=20, help="How many new images to save.")
+    parser.add_argument('--camera', type=int, default=0, help="Camera index.")
+    parser.add_argument('--dataset', default='known_faces')
+    parser.add_argument('--size', type=int, default=200, help="Side length saved crops are resized to.")
+    parser.add_argument('--blur-threshold', type=float, default=25.0,
+                        help="Minimum Laplacian variance; blurrier crops are rejected.")
+    parser.add_argument('--min-hash-distance', type=int, default=5,
+                        help="Crops within this many hash bits of a saved one are skipped as duplicates.")
+    parser.add_argument('--no-preview', action='store_true', help="Do not open a preview window.")
+    parser.add_argument('--no-train', action='store_true', help="Do not update the model afterwards.")
+    args = parser.parse_args()
+
+    save_dir = os.path.join(args.dataset, args.name)
+    os.makedirs(save_dir, exist_ok=True)
+    hashes, next_index = existing_images(save_dir)
+
+    # Load face detector
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+    camera = CameraStream(args.camera)
+    if not camera.start():
+        return
+    saved = blurry = duplicates = 0
+    print("[INFO] Starting face capture. Press 'q' to quit.")
 
-# Parameters
-person_name = "Ayush1"  # 👈 Change this to your name
-save_dir = f"known_faces/{person_name}"
-os.makedirs(save_dir, exist_ok=True)
+    try:
+        while saved < args.count:
+            frame = camera.get_latest_frame()
+            if frame is None:
+                if not camera.is_running():
+                    break
+                continue
 
-# Load face detector
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            faces = face_cascade.detectMultiScale(gray, 1.3, 5, minSize=(80, 80))
 
-cap = cv2.VideoCapture(0)
-count = 0
-print("[INFO] Starting face capture. Press 'q' to quit.")
+            if len(faces):
+                # Only the largest face: the person being enrolled is closest to the camera.
+                x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+                face = cv2.resize(gray[y:y+h, x:x+w], (args.size, args.size), interpolation=cv2.INTER_AREA)
+                face_hash = dhash(face)
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
+                if blur_score(face) < args.blur_threshold:
+                    blurry += 1
+                    color = (0, 0, 255)
+                elif any(hamming(face_hash, h_) <= args.min_hash_distance for h_ in hashes):
+                    duplicates += 1
+                    color = (0, 255, 255)
+                else:
+                    cv2.imwrite(os.path.join(save_dir, f"{next_index}.jpg"), face)
+                    hashes.append(face_hash)
+                    next_index += 1
+                    saved += 1
+                    color = (0, 255, 0)
+                cv2.rectangle(frame, (x, y), (x+w, y+h), color, 2)
 
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    faces = face_cascade.detectMultiScale(gray, 1.3, 5)
+            if not args.no_preview:
+                cv2.imshow("Capturing Faces", frame)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+    finally:
+        camera.stop()
+        if not args.no_preview:
+            cv2.destroyAllWindows()
 
-    for (x, y, w, h) in faces:
-        count += 1
-        face = gray[y:y+h, x:x+w]
-        cv2.imwrite(f"{save_dir}/{count}.jpg", face)
-        cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
+    print(f"[INFO] Saved {saved} images to {save_dir} "
+          f"(rejected {blurry} blurry, skipped {duplicates} near-duplicates).")
 
-    cv2.imshow("Capturing Faces", frame)
-    if cv2.waitKey(1) & 0xFF == ord('q') or count >= 20:
-        break
+    if saved and not args.no_train:
+        FaceRecognizer(dataset_path=args.dataset).train()
 
-cap.release()
-cv2.destroyAllWindows()
-print(f"[INFO] Saved {count} images to {save_dir}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Records examples of a spoken keyword for the offline keyword spotter.
+
+Say the keyword each time you are prompted; the examples are saved to
+keyword_templates/<lang>/<keyword>/. Record every stop word, exit phrase
+and language command you want to work without the network, e.g.:
+
+    python -m Software.enroll_keywords stop --lang en
+    python -m Software.enroll_keywords "থামো" --lang bn --count 6
+
+The keyword must be spelled exactly as in the robot's word lists.
+"""
+import argparse
+import os
+import wave
+import speech_recognition as sr
+from .Audio_Stream import AudioStream
+
+def main():
+    parser = argparse.ArgumentParser(description="Record examples of a keyword for offline spotting.")
+    parser.add_argument('keyword', help="The keyword or short phrase, spelled as in the robot's word lists.")
+    parser.add_argument('--lang', default='en', choices=['en', 'bn'])
+    parser.add_argument('--count', type=int, default=5, help="How many examples to record.")
+    parser.add_argument('--dir', default='keyword_templates')
+    parser.add_argument('--device', type=int, default=None, help="Microphone index.")
+    args = parser.parse_args()
+
+    save_dir = os.path.join(args.dir, args.lang, args.keyword)
+    os.makedirs(save_dir, exist_ok=True)
+    next_index = 1 + max((int(f[:-4]) for f in os.listdir(save_dir) if f[:-4].isdigit()), default=0)
+
+    stream = AudioStream(device_index=args.device)
+    if not stream.start():
+        return
+    print("[INFO] Measuring background noise, please stay quiet...")
+    saved = 0
+    try:
+        while saved < args.count:
+            print(f"Say '{args.keyword}' ({saved + 1}/{args.count})")
+            try:
+                audio = stream.listen(timeout=10, phrase_time_limit=2.0, pause_threshold=0.4)
+            except sr.WaitTimeoutError:
+                print("[INFO] Nothing heard, try again.")
+                continue
+            if audio is None:
+                break
+            with wave.open(os.path.join(save_dir, f"{next_index}.wav"), 'wb') as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(stream.sample_width)
+                wav.setframerate(stream.sample_rate)
+                wav.writeframes(audio.frame_data)
+            next_index += 1
+            saved += 1
+    finally:
+        stream.stop()
+
+    print(f"[INFO] Saved {saved} examples to {save_dir}")
+
+if __name__ == "__main__":
+    main()
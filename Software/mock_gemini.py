@@ -0,0 +1,120 @@
+"""
+A local stand-in for the Gemini API, for running and testing the robot
+without network access or an API key.
+
+It answers generateContent and streamGenerateContent requests with a
+canned reply, streamed word by word with a configurable delay. Start it
+and point the client at it from the project root:
+
+    python -m Software.mock_gemini --port 8765 --delay 0.05
+    GEMINI_BASE_URL=http://127.0.0.1:8765 GEMINI_API_KEY=test python AssistAI_robot.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = ("This is the offline test server speaking. I heard you say: {prompt}. "
+                 "Everything is working as expected.")
+
+class MockGeminiServer:
+    """Serves canned Gemini answers on localhost from a background thread."""
+    def __init__(self, port=0, reply=DEFAULT_REPLY, delay=0.05, first_token_delay=0.2):
+        """
+        Args:
+            port (int): Port to listen on; 0 picks a free one.
+            reply (str): Answer template; {prompt} is replaced with the user's last message.
+            delay (float): Seconds between streamed words.
+            first_token_delay (float): Seconds before the first word, like a model thinking.
+        """
+        self.reply = reply
+        self.delay = delay
+        self.first_token_delay = first_token_delay
+        self.requests = []     # Request bodies received, for tests
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                mock.requests.append(body)
+                contents = body.get('contents') or [{}]
+                prompt = " ".join(part.get('text', '') for part in contents[-1].get('parts', []))
+                words = mock.reply.format(prompt=prompt).split(' ')
+                time.sleep(mock.first_token_delay)
+                if ':streamGenerateContent' in self.path:
+                    self._stream(words)
+                else:
+                    self._send(json.dumps(_chunk(" ".join(words))).encode('utf-8'), 'application/json')
+
+            def _send(self, data, content_type):
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, words):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                try:
+                    for index, word in enumerate(words):
+                        text = word if index == 0 else " " + word
+                        event = f"data: {json.dumps(_chunk(text))}\r\n\r\n".encode('utf-8')
+                        self.wfile.write(f"{len(event):X}\r\n".encode() + event + b"\r\n")
+                        self.wfile.flush()
+                        time.sleep(mock.delay)
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client cancelled the request.
+                    pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def _chunk(text):
+    return {'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}}]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve canned Gemini answers for offline testing.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--reply', default=DEFAULT_REPLY, help="Answer template; {prompt} is the user's message.")
+    parser.add_argument('--delay', type=float, default=0.05, help="Seconds between streamed words.")
+    parser.add_argument('--first-token-delay', type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = MockGeminiServer(args.port, args.reply, args.delay, args.first_token_delay)
+    print(f"[Mock Gemini] Listening on {server.url}. Press Ctrl+C to stop.")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+
+if __name__ == "__main__":
+    main()
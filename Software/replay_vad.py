@@ -0,0 +1,99 @@
+"""
+Replays recorded WAV files through the microphone pipeline's voice
+activity detector, without a microphone or network.
+
+For each file it reports how many segments would have been sent to cloud
+recognition with the detector and with the plain energy threshold alone,
+and where the accepted segments are. Run it from the project root:
+
+    python -m Software.replay_vad recordings/*.wav
+    python -m Software.replay_vad noise.wav --save-segments segments/ --json vad.json
+
+Files should be 16-bit PCM; other sample rates and stereo are converted.
+"""
+import argparse
+import json
+import os
+import wave
+import numpy as np
+from .Audio_Stream import AudioStream
+from .Voice_Activity import VoiceActivityDetector, PhraseSegmenter
+
+def read_wav(path, sample_rate):
+    """Returns the file as 16-bit mono samples at `sample_rate`."""
+    with wave.open(path, 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM is supported")
+        rate = wav.getframerate()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        samples = samples.reshape(-1, wav.getnchannels()).mean(axis=1)
+    if rate != sample_rate:
+        positions = np.arange(0, len(samples), rate / sample_rate)
+        samples = np.interp(positions, np.arange(len(samples)), samples)
+    return samples.astype(np.int16)
+
+def replay(samples, args, vad):
+    """Feeds the samples through a stream and segmenter; returns the accepted segments as (start_s, bytes)."""
+    stream = AudioStream(sample_rate=args.sample_rate, chunk_size=args.chunk_size,
+                         calibration_seconds=args.calibration_seconds)
+    segmenter = PhraseSegmenter(vad, stream.chunk_seconds, args.pause_threshold, args.phrase_time_limit)
+    segments = []
+    for index in range(len(samples) // args.chunk_size):
+        data = samples[index * args.chunk_size:(index + 1) * args.chunk_size].tobytes()
+        energy = stream.feed(data)
+        phrase = segmenter.feed(data, energy, stream.energy_threshold)
+        if phrase is not None:
+            end = (index + 1) * stream.chunk_seconds
+            segments.append((round(end - len(phrase) / 2 / args.sample_rate, 2), phrase))
+    return segments
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay WAV files through the voice activity detector.")
+    parser.add_argument('files', nargs='+', help="WAV recordings to replay.")
+    parser.add_argument('--sample-rate', type=int, default=16000)
+    parser.add_argument('--chunk-size', type=int, default=480)
+    parser.add_argument('--calibration-seconds', type=float, default=1.0)
+    parser.add_argument('--pause-threshold', type=float, default=0.5)
+    parser.add_argument('--phrase-time-limit', type=float, default=2.0)
+    parser.add_argument('--min-zcr', type=float, default=0.01)
+    parser.add_argument('--max-zcr', type=float, default=0.35)
+    parser.add_argument('--min-speech', type=float, default=0.25, help="Seconds of speech a segment needs.")
+    parser.add_argument('--save-segments', help="Write the accepted segments as WAV files to this directory.")
+    parser.add_argument('--json', help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    results = []
+    for path in args.files:
+        samples = read_wav(path, args.sample_rate)
+        vad = VoiceActivityDetector(args.min_zcr, args.max_zcr, args.min_speech)
+        segments = replay(samples, args, vad)
+        # The energy threshold alone, as before the detector: every crossing is recognized.
+        energy_only = VoiceActivityDetector(0.0, 1.0, 0.0)
+        baseline = replay(samples, args, energy_only)
+
+        if args.save_segments:
+            os.makedirs(args.save_segments, exist_ok=True)
+            stem = os.path.splitext(os.path.basename(path))[0]
+            for number, (_, phrase) in enumerate(segments, 1):
+                with wave.open(os.path.join(args.save_segments, f"{stem}_{number}.wav"), 'wb') as wav:
+                    wav.setnchannels(1)
+                    wav.setsampwidth(2)
+                    wav.setframerate(args.sample_rate)
+                    wav.writeframes(phrase)
+
+        results.append({
+            'file': path,
+            'duration_s': round(len(samples) / args.sample_rate, 2),
+            'recognition_calls': len(segments),
+            'recognition_calls_energy_only': len(baseline),
+            'rejected_segments': vad.rejected_count,
+            'segment_starts_s': [start for start, _ in segments],
+        })
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()